@@ -0,0 +1,85 @@
+# === Host benchmark: month-scale reports from SQLite rows vs. compacted .npy columns ===
+# Fills a temp sessions.db with DAYS days of synthetic sessions and presses, runs
+# compact_logs.compact() once, then times the same two reports (reaction-time
+# histogram per button, wrong presses per tile) both ways. First checks that
+# two compact --prune cycles archive every event and lose none.
+#   python3 Test/Bench_Compaction.py
+
+import datetime, os, sys, tempfile, time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import session_store, compact_logs
+
+DAYS, SESSIONS_PER_DAY, PRESSES = 90, 300, 24
+rng = np.random.default_rng(1)
+
+def fill(db):
+    start = time.time() - (DAYS + 1) * 86400
+    sessions, events = [], []
+    for d in range(DAYS):
+        for k in range(SESSIONS_PER_DAY):
+            t = start + d * 86400 + k * 120
+            sid = int(t * 1000)
+            day = datetime.date.fromtimestamp(t).isoformat()
+            sessions.append((sid, day, t, t + 60, 2, "3,12", 1, 1))
+            buttons = rng.integers(0, 8, PRESSES)
+            for j, (b, dt) in enumerate(zip(buttons, rng.gamma(2.0, 0.8, PRESSES))):
+                events.append((sid, 1, j // 3 + 1, float(dt), int(b), int(rng.random() > .08)))
+    with db:
+        db.executemany("""INSERT INTO sessions (id, day, started, ended, players, sequence,
+                                                attempts, won) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                       sessions)
+        db.executemany("""INSERT INTO events (session, attempt, step, t, button, correct)
+                          VALUES (?, ?, ?, ?, ?, ?)""", events)
+    return len(events)
+
+def prune_twice(tmp):
+    """Two write / compact --prune cycles: every event ends up in the archive once."""
+    db_path, log_dir = os.path.join(tmp, "p.db"), os.path.join(tmp, "plogs")
+    db = session_store.connect(db_path)
+    start, written = time.time() - 2 * compact_logs.SETTLE_S, 0
+    for cycle in range(2):
+        for k in range(2):
+            t = start + cycle * 600 + k * 60
+            sid = int(t * 1000)
+            with db:
+                db.execute("""INSERT INTO sessions (id, day, started, ended, players, sequence)
+                              VALUES (?, ?, ?, ?, 1, '1')""",
+                           (sid, datetime.date.fromtimestamp(t).isoformat(), t, t + 30))
+                db.executemany("""INSERT INTO events (session, attempt, step, t, button, correct)
+                                  VALUES (?, 1, 1, ?, ?, 1)""",
+                               [(sid, 0.5 * j, j) for j in range(cycle + 3)])
+            written += cycle + 3
+        compact_logs.compact(db_path, log_dir, prune=True)
+    archived = len(compact_logs.load("events", ("button",), log_dir=log_dir)["button"])
+    left = db.execute("SELECT count(*) FROM events").fetchone()[0]
+    assert (archived, left) == (written, 0), (written, archived, left)
+    print(f"prune twice: {written} events written, {archived} archived, {left} left in SQLite")
+
+def sql_reports(db):
+    hist = db.execute("""SELECT button, CAST(t / 0.5 AS INTEGER) AS bin, count(*)
+                         FROM events WHERE correct GROUP BY button, bin""").fetchall()
+    wrong = db.execute("""SELECT button, sum(NOT correct), count(*)
+                          FROM events GROUP BY button""").fetchall()
+    return hist, wrong
+
+def npy_reports(log_dir):
+    ev = compact_logs.load("events", ("button", "t", "correct"), log_dir=log_dir)
+    return compact_logs.reaction_histograms(ev), compact_logs.wrong_heatmap(ev)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        prune_twice(tmp)
+        db_path, log_dir = os.path.join(tmp, "s.db"), os.path.join(tmp, "logs")
+        db = session_store.connect(db_path)
+        n = fill(db)
+        print(f"{DAYS} days, {DAYS * SESSIONS_PER_DAY} sessions, {n} press events")
+
+        t = time.perf_counter(); sql_reports(db)
+        print(f"SQLite GROUP BY reports   {time.perf_counter() - t:7.3f} s")
+        t = time.perf_counter(); compact_logs.compact(db_path, log_dir, prune=True)
+        print(f"compact (one-off)         {time.perf_counter() - t:7.3f} s")
+        t = time.perf_counter(); npy_reports(log_dir)
+        print(f"mmap .npy reports         {time.perf_counter() - t:7.3f} s")
+        size = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(log_dir) for f in fs)
+        print(f"archive {size / 1e6:.1f} MB ({size / n:.1f} B per event)")
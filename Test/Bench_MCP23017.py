@@ -0,0 +1,50 @@
+# === Host benchmark: I2C bus load and press latency, INT-driven vs polled MCP23017s ===
+# Simulated expanders (mcp23017_in.Sim*) on one shared INT line. Each mode runs a
+# few seconds of random presses in real time; bus occupancy is counted in bits on
+# the wire at 100 kHz, latency is press → game-side edge. Simulated reads are
+# instant: on real hardware add ~0.47 ms of wire time per expander read.
+#   python3 Test/Bench_MCP23017.py
+
+import os, sys, random, statistics, threading, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from mcp23017_in import MCP23017Buttons, SimMCP23017, SimI2C, SimIntLine, I2C_HZ
+
+EXPANDERS = 4                         # 64 tiles
+RUN_S, EDGES_PER_S = 3.0, 4           # busy floor: a press or release every 250 ms
+
+def floor(line):
+    chips = {0x20 + k: SimMCP23017(line) for k in range(EXPANDERS)}
+    bus = SimI2C(chips)
+    return chips, MCP23017Buttons(bus, [(a, line) for a in chips])
+
+def run(mode, period=None):
+    line = SimIntLine()
+    chips, buttons = floor(line)
+    if mode == "poll":
+        line.when_pressed = None      # INT not wired
+        stop = threading.Event()
+        threading.Thread(target=buttons.poll, args=(period, stop), daemon=True).start()
+    bits0, lat = buttons.bits, []
+    rng, held = random.Random(1), set()
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < RUN_S:
+        time.sleep(rng.expovariate(EDGES_PER_S))
+        addr, pin = rng.choice(list(chips)), rng.randrange(16)
+        seq = buttons._seq
+        t = time.perf_counter()
+        chips[addr].press(pin, (addr, pin) not in held)
+        held ^= {(addr, pin)}
+        buttons.wait_change(1.0) if buttons._seq == seq else None
+        lat.append((time.perf_counter() - t) * 1000)
+    elapsed = time.monotonic() - t0
+    if mode == "poll": stop.set()
+    util = (buttons.bits - bits0) / I2C_HZ / elapsed
+    return util, statistics.median(lat), max(lat)
+
+if __name__ == "__main__":
+    print(f"{EXPANDERS} expanders, {EDGES_PER_S} edges/s, I2C {I2C_HZ // 1000} kHz")
+    print(f"{'mode':<16}{'bus busy':>9}{'p50 ms':>9}{'max ms':>9}")
+    for name, mode, period in [("interrupt", "int", None), ("poll 100 Hz", "poll", 0.01),
+                               ("poll 200 Hz", "poll", 0.005), ("poll 500 Hz", "poll", 0.002)]:
+        util, p50, worst = run(mode, period)
+        print(f"{name:<16}{util:>9.1%}{p50:>9.2f}{worst:>9.2f}")
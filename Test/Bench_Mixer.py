@@ -0,0 +1,37 @@
+# === Pi benchmark: CPU cost per active mixer voice (mixer.py) ===
+# Starts 0..VOICES looping voices over the background bed and samples process
+# CPU for a few seconds each; the slope of CPU % against voices is the cost of
+# one voice. Run it on the Pi with the real sound card (or SDL_AUDIODRIVER=dummy
+# elsewhere, which mixes at the same rate into nothing). Needs pygame.
+#   python3 Test/Bench_Mixer.py [theme]
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import numpy as np
+import audio, tones
+
+SECONDS = 3.0
+
+if __name__ == "__main__":
+    audio.init(*sys.argv[1:2])
+    import pygame
+    mixer = audio.mixer
+    rate, size, channels = pygame.mixer.get_init()
+    loop = pygame.mixer.Sound(buffer=tones.to_pcm(tones.render_buttons(1, rate)[0],
+                                                  channels, size).tobytes())
+    loop.set_volume(0.05)
+    rows = []
+    print(f"{'voices':>6}{'CPU %':>8}")
+    for n in range(len(mixer.channels) + 1):
+        for k in range(n):
+            mixer.channels[k].play(loop, loops=-1)
+        time.sleep(0.5)
+        c0, t0 = time.process_time(), time.monotonic()
+        time.sleep(SECONDS)
+        cpu = (time.process_time() - c0) / (time.monotonic() - t0) * 100
+        rows.append((n, cpu))
+        print(f"{n:>6}{cpu:>8.2f}")
+        pygame.mixer.stop()
+    n, cpu = np.array(rows).T
+    slope, base = np.polyfit(n, cpu, 1)
+    print(f"bed + mixer idle {base:.2f} % CPU, {slope:.3f} % per active voice")
@@ -0,0 +1,55 @@
+# === Host benchmark: PCA9685 I2C cost per animation frame ===
+# Counts I2C transactions, bytes and bus time for pca9685_out.py block writes
+# versus the per-channel duty_cycle assignments used in Test/IfLEDWorks_Circle.py
+# (adafruit_pca9685: one 5-byte register write per channel). No hardware needed.
+#   python3 Test/Bench_PCA9685.py
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import pca9685_out
+from pca9685_out import PCA9685Leds
+
+pca9685_out.time.sleep = lambda s: None       # no real oscillator to wait for
+CHANNELS = [5, 6, 7, 8, 9, 10, 11, 12]        # same wiring as the Test scripts
+SYSCALL_US = 60                               # rough Linux i2c-dev ioctl overhead
+
+class FakeI2C:
+    def try_lock(self): return True
+    def unlock(self): pass
+    def writeto(self, addr, buf): pass
+
+def bus_ms(transactions, nbytes, hz):
+    bits = nbytes * 9 + transactions * 2      # 8 data + ACK per byte, START/STOP
+    return bits / hz * 1000 + transactions * SYSCALL_US / 1000
+
+def per_channel(prev, frame):
+    changed = [ch for ch in range(16) if frame[ch] != prev[ch]]
+    return len(changed), len(changed) * 6     # addr + reg + 4 data bytes each
+
+leds = PCA9685Leds(FakeI2C(), CHANNELS)
+def frames():
+    yield "marquee step", [leds.mask_frame(1 << 3), leds.mask_frame(1 << 4)]
+    yield "3-LED step on", [leds.mask_frame(0), leds.mask_frame(0b10010010)]
+    yield "blink all 8",  [leds.mask_frame(0), leds.mask_frame(0xFF)]
+    leds.show(leds.mask_frame(0))
+    yield "0.5 s fade @50fps", [leds.mask_frame(0)] + leds.fade_frames(leds.mask_frame(0xFF), 25)
+
+print(f"{'animation':<20}{'frames':>7}{'per-channel tx/B/ms':>24}{'block tx/B/ms':>20}")
+for name, seq in frames():
+    pc_tx = pc_b = 0
+    leds.show(seq[0], force=True)
+    t0, b0 = leds.transactions, leds.bytes
+    for prev, frame in zip(seq, seq[1:]):
+        tx, nb = per_channel(prev, frame); pc_tx += tx; pc_b += nb
+        leds.show(frame)
+    tx, nb = leds.transactions - t0, leds.bytes - b0
+    n = len(seq) - 1
+    print(f"{name:<20}{n:>7}"
+          f"{pc_tx:>9}/{pc_b:>4}/{bus_ms(pc_tx, pc_b, 100_000):>7.2f}"
+          f"{tx:>8}/{nb:>4}/{bus_ms(tx, nb, 100_000):>6.2f}")
+print(f"bus time at 100 kHz + ~{SYSCALL_US} µs per transaction; "
+      "per-frame cost = totals / frames")
+
+t = time.perf_counter()
+for _ in range(2000): leds.fade_frames(leds.mask_frame(0xFF), 25)
+print(f"fade_frames: {(time.perf_counter() - t) / 2000 * 1e6 / 25:.1f} µs per computed frame")
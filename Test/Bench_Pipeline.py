@@ -0,0 +1,103 @@
+# === Host benchmark: cross-process event latency and stage isolation ===
+# 1) press → game-stage latency of an event through pipeline.ShmRing
+# 2) isolation: button events keep flowing to the game stage while the output
+#    stage is stuck in a 300 ms GIL-holding "WAV decode"; compared with the
+#    single-interpreter layout where the same stall runs in a thread.
+# 3) several lane threads writing the command ring through RemoteOutputs at
+#    once: every record must reach the consumer (put() holds the ring's lock)
+#   python3 Test/Bench_Pipeline.py
+
+import os, sys, time, threading, queue
+from multiprocessing import Process
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from pipeline import ShmRing, RemoteOutputs, EV_MASK, OP_SOUND
+
+EVENTS, GAP = 400, 0.005                 # 200 edges/s, well above any player
+STALL_N = 30_000_000                  # sum(range(N)) holds the GIL the whole time
+LANES, PER_LANE = 4, 100_000
+
+def pct(xs, p): return sorted(xs)[min(len(xs) - 1, int(len(xs) * p))]
+def show(name, lat):
+    print(f"{name:<34} p50 {pct(lat, .5):8.1f} µs  p99 {pct(lat, .99):9.1f} µs  "
+          f"max {max(lat):9.1f} µs")
+
+def presses(n, gap):
+    """Simulated presses on a fixed grid; yields the press time (ns) once it is due.
+    Latency is measured from the press, so a stalled sampler counts too."""
+    t0 = time.monotonic_ns() + 1_000_000
+    for i in range(n):
+        t = t0 + int(i * gap * 1e9)
+        while (now := time.monotonic_ns()) < t:
+            time.sleep((t - now) / 1e9)
+        yield t
+
+def producer(spec, n, gap):
+    ring = ShmRing.attach(*spec)
+    for i, t in enumerate(presses(n, gap)):
+        ring.put(EV_MASK, i & 0xFF, t_ns=t)
+
+def stalling_output(spec, stop_spec):
+    ring, stop = ShmRing.attach(*spec), ShmRing.attach(*stop_spec)
+    while stop.get() is None:
+        rec = ring.get_wait(0.01)
+        if rec and rec[1] == OP_SOUND:
+            sum(range(STALL_N))       # the slow load
+
+def consume(ring, n):
+    lat = []
+    while len(lat) < n:
+        rec = ring.get_wait(5)
+        lat.append((time.monotonic_ns() - rec[0]) / 1000)
+    return lat
+
+if __name__ == "__main__":
+    # 1) plain latency
+    ring = ShmRing.create()
+    p = Process(target=producer, args=(ring.spec(), EVENTS, GAP)); p.start()
+    show("ShmRing process→process", consume(ring, EVENTS)); p.join()
+
+    # 2a) pipeline: output stage stalls in its own process
+    cmd, stop = ShmRing.create(), ShmRing.create()
+    out = Process(target=stalling_output, args=(cmd.spec(), stop.spec())); out.start()
+    p = Process(target=producer, args=(ring.spec(), EVENTS, GAP)); p.start()
+    for _ in range(5): cmd.put(OP_SOUND)
+    show("pipeline, output stage stalling", consume(ring, EVENTS)); p.join()
+    stop.put(0); out.join()
+
+    # 2b) one interpreter: input thread → game thread, output thread stalls
+    q = queue.Queue()
+    def input_thread():
+        for t in presses(EVENTS, GAP):
+            q.put(t)
+    def output_thread():
+        for _ in range(5): sum(range(STALL_N))
+    threading.Thread(target=output_thread, daemon=True).start()
+    threading.Thread(target=input_thread, daemon=True).start()
+    lat = []
+    for _ in range(EVENTS):
+        t = q.get()
+        lat.append((time.monotonic_ns() - t) / 1000)
+    show("threads, output thread stalling", lat)
+
+    # 3) concurrent producers, one consumer
+    lanes = ShmRing.create()
+    got = []
+    def drain():
+        while (rec := lanes.get_wait(2)) is not None:
+            got.append(rec)
+    outputs = RemoteOutputs(lanes)
+    writers = [threading.Thread(target=lambda k=k: [outputs.play("p1.wav", k)
+                                                      for _ in range(PER_LANE)],
+                                daemon=True)       # a torn head can block them for good
+               for k in range(LANES)]
+    reader = threading.Thread(target=drain); reader.start()
+    t0 = time.perf_counter()
+    for w in writers: w.start()
+    for w in writers: w.join(30)
+    reader.join()
+    ms = (time.perf_counter() - t0) * 1000
+    print(f"{LANES} lanes × {PER_LANE} puts: {len(got)} of {LANES * PER_LANE} "
+          f"records delivered in {ms:.0f} ms")
+    assert len(got) == LANES * PER_LANE
+
+    for r in (ring, cmd, stop, lanes): r.close()
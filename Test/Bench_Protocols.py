@@ -0,0 +1,49 @@
+# === Host benchmark: bytes on the wire and encode time per output operation ===
+# No hardware needed: a fake link just collects what each protocol would send.
+# Compares every protocols.py encoder with the old per-call f-string + .encode().
+#   python3 Test/Bench_Protocols.py
+
+import os, sys, timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from protocols import (CharProtocol, OnOffProtocol, TextProtocol, FountainProtocol,
+                       Driver, GAME, PUMP)
+
+BAUD = 9600
+N = 20000
+
+class FakeLink:
+    def __init__(self): self.bytes = 0
+    def write(self, data, cmds=1): self.bytes += len(data)
+    def write_lines(self, lines):  self.bytes += sum(map(len, lines))
+
+def ops(d):
+    """Representative game operations, each starting from a known bank state."""
+    def step_on():   d.state[GAME] = 0;    d.game_leds(0b10010010)
+    def all_off():   d.state[PUMP] = 0xFF; d.pumps(0)
+    def blink():     d.state[GAME] = 0; d.state[PUMP] = 0; d.game_leds(0xFF); d.pumps(0xFF)
+    return {"single LED on": lambda: d.game_led(3, True),
+            "3-LED step on": step_on,
+            "all pumps off": all_off,
+            "win blink frame": blink}
+
+# old Final_RaspberryPi.py path: format + encode every call, one command per pin
+def legacy(send):
+    return {"single LED on": lambda: send(f"LED_{'ON'} {3}"),
+            "3-LED step on": lambda: [send(f"LED_{'ON'} {i}") for i in (1, 4, 7)],
+            "all pumps off": lambda: [send(f"PUMP_{'OFF'} {i}") for i in range(8)],
+            "win blink frame": lambda: [send(f"{k}_{'ON'} {i}") for k in ("LED", "PUMP")
+                                        for i in range(8)]}
+
+def report(name, table, link):
+    for op, fn in table.items():
+        link.bytes = 0; fn(); nbytes = link.bytes
+        us = timeit.timeit(fn, number=N) / N * 1e6
+        wire = nbytes * 10 / BAUD * 1000
+        print(f"{name:<16}{op:<18}{nbytes:>6} B{wire:>9.1f} ms{us:>9.2f} µs")
+
+print(f"{'protocol':<16}{'operation':<18}{'bytes':>8}{'wire@9600':>12}{'encode':>12}")
+link = FakeLink()
+report("f-string (old)", legacy(lambda c: link.write((c + '\n').encode())), link)
+for proto in (CharProtocol(), OnOffProtocol(), TextProtocol(), FountainProtocol()):
+    report(proto.name, ops(Driver(proto, link)), link)
+print("char / on-off firmwares have no pumps: their pump rows send nothing.")
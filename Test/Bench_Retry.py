@@ -0,0 +1,50 @@
+# === Host model: retry modes vs. session length and players served per hour ===
+# Monte-Carlo sessions timed with the constants of Final_RaspberryPi.py, each wrong
+# press handled by retry_policy.RetryPolicy.plan(). A group fails a step attempt
+# with probability P_FAIL and gives up once a session passes GIVE_UP_S.
+#   python3 Test/Bench_Retry.py
+
+import os, sys, random, statistics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from retry_policy import RetryPolicy
+
+WAITING, DEMO_STEP, SCHED_LEAD, GAP, WRONG_FLASH, WIN = 2.0, 1.7, 0.15, 0.5, 2.0, 10.0
+CHANGEOVER = 5.0                      # next group steps on
+GIVE_UP_S = 180.0
+SESSIONS = 20000
+
+def steps_for(players):               # generate_state at 8 tiles
+    return (3, 5) if players > 5 else (8 - players, players)
+
+def session(policy, p_fail, rng):
+    players = rng.randint(1, 4)
+    n, size = steps_for(players)
+    t, start, demo = WAITING, 0, slice(None)
+    while True:
+        t += SCHED_LEAD + DEMO_STEP * len(range(n)[demo])
+        for k in range(start, n):
+            t += rng.gammavariate(2.0, 0.6) + 0.3 * (size - 1)    # press the step
+            if rng.random() < p_fail:
+                t += WRONG_FLASH
+                if t > GIVE_UP_S:
+                    return players, t, False
+                start, demo = policy.plan(k)
+                break
+            t += GAP
+        else:
+            return players, t + WIN, True
+
+if __name__ == "__main__":
+    policies = [RetryPolicy("restart"), RetryPolicy("rollback", 2),
+                RetryPolicy("rollback", 1), RetryPolicy("resume")]
+    for p_fail in (0.05, 0.10, 0.20):
+        print(f"P_FAIL {p_fail:.0%} per step attempt")
+        print(f"  {'mode':<12}{'avg s':>7}{'p90 s':>7}{'won':>7}{'players/h':>11}")
+        for policy in policies:
+            rng = random.Random(7)
+            runs = [session(policy, p_fail, rng) for _ in range(SESSIONS)]
+            lengths = [t for _, t, _ in runs]
+            per_hour = 3600 * sum(p for p, _, _ in runs) / sum(t + CHANGEOVER for t in lengths)
+            print(f"  {str(policy):<12}{statistics.mean(lengths):>7.1f}"
+                  f"{statistics.quantiles(lengths, n=10)[-1]:>7.1f}"
+                  f"{sum(w for _, _, w in runs) / SESSIONS:>7.1%}{per_hour:>11.1f}")
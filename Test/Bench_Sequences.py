@@ -0,0 +1,41 @@
+# === Host benchmark: sequence generation, plain sample vs. sequences.SequenceEngine ===
+# Per floor size and step size: one-off table build time, time per drawn step,
+# how often a step repeats / heavily overlaps the previous one, and mean spread.
+#   python3 Test/Bench_Sequences.py
+
+import os, sys, random, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from sequences import SequenceEngine
+
+STEPS = 20000
+
+def plain(n, k, rng, prev):
+    return sum(1 << i for i in rng.sample(range(n), k))
+
+def measure(draw, eng, k):
+    prev, repeats, over, spread = 0, 0, 0, 0
+    t0 = time.perf_counter()
+    for _ in range(STEPS):
+        mask = draw(k, prev)
+        repeats += mask == prev
+        over += (mask & prev).bit_count() > eng.max_overlap(k)
+        spread += eng.spread(mask)
+        prev = mask
+    us = (time.perf_counter() - t0) / STEPS * 1e6
+    return us, repeats / STEPS, over / STEPS, spread / STEPS
+
+if __name__ == "__main__":
+    print(f"{'N':>3}{'k':>3}  {'gen':<7}{'build ms':>9}{'us/step':>9}"
+          f"{'repeat':>8}{'overlap':>8}{'spread':>8}")
+    for n, k in ((8, 1), (8, 3), (8, 5), (16, 4), (16, 8), (32, 4), (64, 8), (64, 32)):
+        rng = random.Random(1)
+        eng = SequenceEngine(n, seed=1)
+        t0 = time.perf_counter()
+        eng.table(k)
+        build = (time.perf_counter() - t0) * 1000
+        for name, draw, ms in (("sample", lambda k, p: plain(n, k, rng, p), 0.0),
+                               ("engine", eng.step, build)):
+            us, rep, over, spread = measure(draw, eng, k)
+            print(f"{n:>3}{k:>3}  {name:<7}{ms:>9.1f}{us:>9.2f}{rep:>8.2%}{over:>8.2%}{spread:>8.2f}")
+    # us/step includes the bench's own spread() per step; builds of 0.0 ms are
+    # the large-floor path (no table)
@@ -0,0 +1,52 @@
+# === Host benchmark: per-tick cost of play_state as the floor grows ===
+# One tick = read the press mask, log new presses, check for a wrong press,
+# collect new hits. "lists" is the old index-list code (triggered = [False]*8,
+# `idx not in targets`), "bitsets" is masks.tick() as play_state calls it.
+# Also: sequences.SequenceEngine per step, and bytes per frame when a one-corner
+# change is written to a floor sharded over 8-tile boards (shards.py).
+#   python3 Test/Bench_Tiles.py
+
+import os, sys, timeit
+from random import sample, seed
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from protocols import FountainProtocol, Driver
+from shards import ShardedOutputs
+from masks import tick
+from sequences import SequenceEngine
+
+SIZES = (8, 16, 32, 64)
+K = 3                                   # targets per step (3 players)
+
+def tick_lists(n, targets, pressed_mask):
+    pressed = [i for i in range(n) if pressed_mask >> i & 1]      # pressed_indices()
+    triggered = [False] * n
+    wrong = [idx for idx in pressed if idx not in targets]
+    for idx in targets:
+        if idx in pressed and not triggered[idx]:
+            triggered[idx] = True
+    return wrong, all(triggered[i] for i in targets)
+
+class FakeLink:
+    def __init__(self): self.bytes = 0
+    def write(self, data, cmds=1): self.bytes += len(data)
+    def write_lines(self, lines):  self.bytes += sum(map(len, lines))
+
+if __name__ == "__main__":
+    seed(1)
+    print(f"{'tiles':>5}{'lists µs':>10}{'bitsets µs':>12}{'gen µs/step':>13}{'B/frame':>9}")
+    for n in SIZES:
+        idx = sample(range(n), K)
+        tmask = sum(1 << i for i in idx)
+        pressed = tmask & ~(1 << idx[0])                  # two of three targets down
+        reps = 20000
+        t_list = timeit.timeit(lambda: tick_lists(n, idx, pressed), number=reps) / reps
+        t_bits = timeit.timeit(lambda: tick(tmask, pressed, 0, 0), number=reps) / reps
+        eng = SequenceEngine(n, seed=1)
+        eng.table(K)                                      # built during the win show
+        t_gen = timeit.timeit(lambda: eng.step(K), number=reps) / reps
+        links = [FakeLink() for _ in range(n // 8)]
+        out = ShardedOutputs([Driver(FountainProtocol(), l) for l in links], [8] * (n // 8))
+        out.game_leds(0); before = sum(l.bytes for l in links)
+        out.game_leds(0b101)                              # corner tiles light up
+        frame = sum(l.bytes for l in links) - before
+        print(f"{n:>5}{t_list * 1e6:>10.2f}{t_bits * 1e6:>12.2f}{t_gen * 1e6:>13.2f}{frame:>9}")
@@ -0,0 +1,36 @@
+# === Host benchmark: tones.py render cost and press → sound latency ===
+# Renders the tone bank for growing floors (NumPy only), then, if pygame is
+# installed, builds the real ToneBank on the configured mixer and measures
+# play() calls. SDL_AUDIODRIVER=dummy works on a machine without a sound card.
+#   python3 Test/Bench_Tones.py
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import numpy as np
+import tones
+
+if __name__ == "__main__":
+    print(f"{'tiles':>5}{'render ms':>11}{'KiB':>8}")
+    for n in (8, 16, 32, 64):
+        t0 = time.perf_counter()
+        waves = list(tones.render_buttons(n)) + [tones.render_error(), tones.render_success()]
+        pcm = [tones.to_pcm(w) for w in waves]
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{n:>5}{ms:>11.1f}{sum(p.nbytes for p in pcm) / 1024:>8.0f}")
+
+    try:
+        import pygame
+    except ImportError:
+        sys.exit("pygame not installed: playback latency not measured")
+    import audio
+    audio.init()
+    bank = tones.ToneBank(8)
+    calls = []
+    for k in range(200):
+        t0 = time.perf_counter()
+        bank.play(k % 8)
+        calls.append(time.perf_counter() - t0)
+    calls = np.array(calls) * 1e6
+    print(f"play(): p50 {np.median(calls):.0f} us, max {calls.max():.0f} us; mixer buffer "
+          f"{audio.AUDIO_BUFFER / bank.rate * 1000:.1f} ms; worst press → sound "
+          f"{bank.latency_ms():.1f} ms (target < 10 ms)")
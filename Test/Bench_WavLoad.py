@@ -0,0 +1,72 @@
+# === Host / Pi benchmark: loading every track of music/ and src/HP/ ===
+# Each loader runs in a fresh interpreter; RSS is split into anonymous memory
+# (private to the process) and file-backed pages (shared via the page cache).
+#   read      f.read() of the whole file into bytes (the old audio_analysis path)
+#   mmap      wavmap.WavMap + a pass over the NumPy view, as audio_analysis reads
+#             them; no Sound is built, so this is not a playback path
+#   music     pygame.mixer.music.load per file (the old stage-track path)
+#   sound     pygame.mixer.Sound(path), decoded by SDL_mixer
+#   pack      themes.Pack(...).load() of every pack, as audio.init / select load
+#             them, float tracks converted from their mapping (HP also counts
+#             the p8.wav it borrows from music/)
+# pygame modes run with SDL_AUDIODRIVER=dummy if no sound card; skipped without pygame.
+#   python3 Test/Bench_WavLoad.py
+
+import os, subprocess, sys, time
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+DIRS = [os.path.join(HERE, "..", "music"), os.path.join(HERE, "..", "src", "HP")]
+MODES = ("read", "mmap", "music", "sound", "pack")
+
+def rss_kib():
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return int(fields["RssAnon"].split()[0]), int(fields["RssFile"].split()[0])
+
+def run(mode):
+    files = [os.path.join(d, f) for d in DIRS for f in sorted(os.listdir(d)) if f.endswith(".wav")]
+    if mode in MODES[2:]:
+        import pygame, audio
+        pygame.mixer.pre_init(44100, audio.MIXER_SIZE, 2, audio.AUDIO_BUFFER)
+        pygame.mixer.init()
+    from wavmap import WavMap
+    from themes import Themes
+    themes = Themes()
+    anon0, file0 = rss_kib()
+    keep = []
+    t0 = time.perf_counter()
+    for path in files:
+        if mode == "read":
+            with open(path, "rb") as f:
+                keep.append(f.read())
+        elif mode == "mmap":
+            wav = WavMap(path)
+            float(wav.array().sum())
+            keep.append(wav)
+        elif mode == "music":
+            pygame.mixer.music.load(path)
+        elif mode == "sound":
+            keep.append(pygame.mixer.Sound(path))
+    if mode == "pack":
+        keep = [themes.pack(name).load() for name in themes.paths]
+        files = [f for p in keep for f in p.sounds]
+    ms = (time.perf_counter() - t0) * 1000
+    anon, file = rss_kib()
+    print(f"{mode:<8}{len(files):>6}{ms:>10.1f}{(anon - anon0) / 1024:>10.1f}{(file - file0) / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+        sys.exit()
+    try:
+        import pygame
+        modes = MODES
+    except ImportError:
+        print("pygame not installed: pygame modes skipped")
+        modes = MODES[:2]
+    env = dict(os.environ, SDL_AUDIODRIVER=os.environ.get("SDL_AUDIODRIVER", "dummy"),
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    print(f"{'mode':<8}{'files':>6}{'load ms':>10}{'anon MiB':>10}{'file MiB':>10}")
+    for mode in modes:
+        subprocess.run([sys.executable, __file__, mode], env=env, check=False)
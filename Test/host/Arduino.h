@@ -0,0 +1,85 @@
+/* ==== Arduino.h (host shim) ====
+   Just enough of the Arduino core for src/Final_Arduino.ino to build with g++
+   on Linux: pins are plain arrays, Serial reads from an injected byte queue and
+   counts what the sketch prints. Used by the host benchmarks in this folder.
+*/
+#pragma once
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <chrono>
+#include <deque>
+
+typedef uint8_t byte;
+#define HIGH 1
+#define LOW  0
+#define INPUT        0
+#define OUTPUT       1
+#define INPUT_PULLUP 2
+#define DEC 10
+#define HEX 16
+#define SERIAL_RX_BUFFER_SIZE 64
+#define NOT_A_PIN 0
+#define PA 1
+#define PB 2
+#define PC 3
+#define PE 5
+#define PG 7
+#define PH 8
+
+namespace shim {
+  static uint8_t  pinState[70];
+  static uint8_t  pinInput[70];               // what digitalRead() returns
+  static uint32_t pinWrites = 0;
+  static volatile uint8_t ports[13];          // PORTx output registers, indexed by PA..PL
+  struct PinMap { uint8_t port, bit; };
+  static const PinMap megaPins[38] = {        // Mega 2560 D0–D37 (the pins the sketch uses)
+    {0,0},{0,0},{PE,4},{PE,5},{PG,5},{PE,3},{PH,3},{PH,4},{PH,5},{PH,6},
+    {PB,4},{PB,5},{PB,6},{PB,7},{0,0},{0,0},{0,0},{0,0},{0,0},{0,0},
+    {0,0},{0,0},{PA,0},{PA,1},{PA,2},{PA,3},{PA,4},{PA,5},{PA,6},{PA,7},
+    {PC,7},{PC,6},{PC,5},{PC,4},{PC,3},{PC,2},{PC,1},{PC,0},
+  };
+  static auto t0 = std::chrono::steady_clock::now();
+  static inline uint64_t nowUs() {
+    return std::chrono::duration_cast<std::chrono::microseconds>(
+      std::chrono::steady_clock::now() - t0).count();
+  }
+}
+
+static uint8_t SREG = 0;
+static inline void cli() {}
+static inline uint8_t digitalPinToPort(uint8_t pin) { return pin < 38 ? shim::megaPins[pin].port : NOT_A_PIN; }
+static inline uint8_t digitalPinToBitMask(uint8_t pin) { return pin < 38 ? 1 << shim::megaPins[pin].bit : 0; }
+static inline volatile uint8_t* portOutputRegister(uint8_t port) { return &shim::ports[port]; }
+
+static inline unsigned long millis() { return (unsigned long)(shim::nowUs() / 1000); }
+static inline unsigned long micros() { return (unsigned long)shim::nowUs(); }
+static inline void pinMode(uint8_t pin, uint8_t mode) { if (mode == INPUT_PULLUP) shim::pinInput[pin] = HIGH; }
+static inline void digitalWrite(uint8_t pin, uint8_t v) { shim::pinState[pin] = v; shim::pinWrites++; }
+static inline int  digitalRead(uint8_t pin) { return shim::pinInput[pin]; }
+
+class HostSerial {
+ public:
+  std::deque<uint8_t> in;                     // bytes "sent by the Pi"
+  uint32_t txBytes = 0;
+  bool echo = false;
+
+  void begin(unsigned long) {}
+  void inject(const char* s) { while (*s) in.push_back((uint8_t)*s++); }
+  int  available() { return in.size() > SERIAL_RX_BUFFER_SIZE ? SERIAL_RX_BUFFER_SIZE : (int)in.size(); }
+  int  read() { if (in.empty()) return -1; int c = in.front(); in.pop_front(); return c; }
+
+  void print(const char* s)           { out(s); }
+  void print(char c)                  { char b[2] = {c, 0}; out(b); }
+  void print(long v, int base = DEC)  { char b[24]; snprintf(b, sizeof b, base == HEX ? "%lX" : "%ld", v); out(b); }
+  void print(unsigned long v, int base = DEC) { print((long)v, base); }
+  void print(int v, int base = DEC)   { print((long)v, base); }
+  void print(unsigned v, int base = DEC) { print((long)v, base); }
+  void print(byte v, int base = DEC)  { print((long)v, base); }
+  template <typename T> void println(T v)            { print(v); out("\r\n"); }
+  template <typename T> void println(T v, int base)  { print(v, base); out("\r\n"); }
+
+ private:
+  void out(const char* s) { txBytes += strlen(s); if (echo) fputs(s, stdout); }
+};
+static HostSerial Serial;
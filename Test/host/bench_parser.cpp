@@ -0,0 +1,52 @@
+/* ==== Host benchmark for the firmware command path ====
+   Builds the real src/Final_Arduino.ino against the Arduino.h shim and measures
+     1) commands/s end-to-end (serialEvent → ring → parser → handleCmd)
+     2) worst-case and mean time to parse + dispatch a single line
+     3) which output banks got the single-port-write path
+   Numbers are for the host CPU; a 16 MHz AVR is roughly 100–200× slower.
+
+     g++ -O2 -std=gnu++11 -I. bench_parser.cpp -o bench_parser && ./bench_parser
+*/
+#include "Arduino.h"
+#include "../../src/Final_Arduino.ino"
+
+static const char* MIX[] = {
+  "LED_ON 3\n", "LED_OFF 3\n", "PUMP_ON 7\n", "PUMP_OFF 7\n",
+  "WAIT_ON 1\n", "WAIT_OFF 1\n", "TARGET 137\n", "BOGUS 1\n",
+  "PUMPS 255\n", "WAITS 5\n", "LEDS 170\n", "PUMPS 0\n",
+};
+static const int NMIX = sizeof MIX / sizeof MIX[0];
+
+int main() {
+  setup();
+  const int N = 200000;
+
+  // 1) end-to-end throughput through the sketch's own serialEvent()/loop()
+  for (int i = 0; i < N; i++) Serial.inject(MIX[i % NMIX]);
+  uint64_t t = shim::nowUs();
+  while (!Serial.in.empty() || rx.size()) { serialEvent(); loop(); }
+  double secs = (shim::nowUs() - t) / 1e6;
+  printf("end-to-end : %d cmds in %.3f s → %.0f cmds/s (applied %lu, errors %lu)\n",
+         N, secs, N / secs, (unsigned long)parser.applied, (unsigned long)parser.errors);
+
+  // 2) per-line parse + dispatch latency straight into the parser
+  using clk = std::chrono::steady_clock;
+  double worst = 0, total = 0;
+  const char* worstCmd = "";
+  for (int i = 0; i < N; i++) {
+    const char* s = MIX[i % NMIX];
+    auto a = clk::now();
+    for (const char* p = s; *p; p++) parser.feed(*p);
+    double ns = std::chrono::duration<double, std::nano>(clk::now() - a).count();
+    total += ns;
+    if (ns > worst) { worst = ns; worstCmd = s; }
+  }
+  printf("per line   : mean %.1f ns, worst %.1f ns (%.*s)\n",
+         total / N, worst, (int)strlen(worstCmd) - 1, worstCmd);
+  printf("pin writes : %u, serial tx bytes: %u\n", shim::pinWrites, Serial.txBytes);
+  const Bank* banks[] = {&gameBank, &waitBank, &pumpBank};
+  const char* names[] = {"LEDS", "WAITS", "PUMPS"};
+  for (int i = 0; i < 3; i++)
+    printf("%-5s      : %s\n", names[i], banks[i]->port ? "single port write" : "digitalWrite per pin");
+  return 0;
+}
@@ -0,0 +1,103 @@
+/* ==== CmdParser.h ====
+   Allocation-free command path for Final_Arduino.ino:
+     RingBuf  – fixed 64-byte FIFO between serialEvent() and the parser
+     Parser   – byte-at-a-time state machine, VERB → ARG… → dispatch on '\n'
+   The verb is hashed while it streams in, so dispatch is a plain switch on
+   cmd::hash("LED_ON") style constants — no String, no heap, no strcmp.
+   Only <stdint.h> is needed, so it also builds on Linux (Test/host/).
+*/
+#pragma once
+#include <stdint.h>
+
+namespace cmd {
+
+// 16-bit FNV-1a; constexpr so it can be used as a case label
+constexpr uint16_t hash(const char* s, uint16_t h = 0x9DC5) {
+  return *s ? hash(s + 1, (uint16_t)((uint32_t)(h ^ (uint8_t)*s) * 0x0193u)) : h;
+}
+inline uint16_t hashStep(uint16_t h, char c) {
+  return (uint16_t)((uint32_t)(h ^ (uint8_t)c) * 0x0193u);
+}
+
+const uint8_t MAX_ARGS = 3;
+const uint8_t MAX_VERB = 12;
+
+struct Command {
+  uint16_t verb;
+  uint8_t  argc;
+  uint32_t argv[MAX_ARGS];
+};
+
+template <uint8_t N>
+class RingBuf {                          // N must be a power of two
+ public:
+  bool    push(uint8_t c) { if (size() == N) return false; buf[head++ & (N-1)] = c; return true; }
+  uint8_t pop()           { return buf[tail++ & (N-1)]; }
+  uint8_t size() const    { return (uint8_t)(head - tail); }
+  uint8_t space() const   { return N - size(); }
+ private:
+  uint8_t buf[N];
+  volatile uint8_t head = 0, tail = 0;
+};
+
+class Parser {
+ public:
+  typedef bool (*Handler)(const Command&);   // return false for an unknown verb
+  explicit Parser(Handler h) : handler(h) { reset(); }
+
+  uint32_t applied = 0;                  // commands the handler accepted
+  uint32_t errors  = 0;                  // unknown verb / bad arg / overlong line
+
+  // Feed one byte. Returns true when it completed and dispatched a command.
+  bool feed(char c) {
+    bool eol = (c == '\n' || c == '\r');
+    switch (st) {
+      case VERB:
+        if (eol)         return finish();
+        if (c == ' ')    { if (len) st = ARG; return false; }
+        if (++len > MAX_VERB) return fail();
+        cur.verb = hashStep(cur.verb, c);
+        return false;
+
+      case ARG:
+        if (c >= '0' && c <= '9') {
+          if (!open) {
+            if (cur.argc == MAX_ARGS) return fail();
+            open = true; cur.argv[cur.argc] = 0;
+          }
+          cur.argv[cur.argc] = cur.argv[cur.argc] * 10 + (c - '0');
+          return false;
+        }
+        if (open && (c == ' ' || eol)) { cur.argc++; open = false; }
+        if (eol)         return finish();
+        if (c == ' ')    return false;
+        return fail();
+
+      case SKIP:
+        if (eol) reset();
+        return false;
+    }
+    return false;
+  }
+
+ private:
+  enum State : uint8_t { VERB, ARG, SKIP };
+  Handler handler;
+  Command cur;
+  State   st;
+  uint8_t len;
+  bool    open;
+
+  void reset() { st = VERB; len = 0; open = false; cur.verb = hash(""); cur.argc = 0; }
+
+  bool fail() { errors++; st = SKIP; return false; }   // drop the rest of the line
+
+  bool finish() {
+    bool any = len != 0;
+    if (any) { if (handler(cur)) applied++; else errors++; }
+    reset();
+    return any;
+  }
+};
+
+}  // namespace cmd
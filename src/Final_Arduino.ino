@@ -2,58 +2,267 @@
    • GAME LEDs : D2–D9   (index 0–7)
    • WAIT LEDs : D10–D13 (index 0–3)
    • PUMPS     : D22–D29 (index 0–7)
+   • BUTTONS   : D30–D37 (index 0–7，可选：SCAN 1 时由 Mega 扫描，低电平=按下)
+   各组数量由下面的引脚数组长度决定（每组最多 32 个）；更大的地面由多块板子
+   分片驱动，每块板只管自己的一段，树莓派端按板拼接全局编号（见 shards.py）
 
    接收来自树莓派的串口指令（9600-8-N-1，换行结尾）：
      LED_ON  n      / LED_OFF  n
      WAIT_ON n      / WAIT_OFF n
      PUMP_ON n      / PUMP_OFF n
+     SCAN 1 / SCAN 0            开 / 关 Mega 端按键扫描
+     TARGET mask                本步目标按键位掩码（bit i = 按键 i，0 = 无）
+                                命中目标的按下由 Mega 立即点亮 LED + 水泵
+     LEDS m / WAITS m / PUMPS m 整组写入位掩码（bit i = 索引 i）
+                                同一端口且位连续的组（PUMPS→PORTA，WAITS→PORTB4-7）
+                                一次端口寄存器写入同时切换；其余组逐脚 digitalWrite
+     SYNC                       立即回 T <micros>，供树莓派做时钟同步
+     AT t b m                   在 micros()==t 时执行整组写入：b 0=LEDS 1=WAITS 2=PUMPS
+                                按时间排序存入 SCHED_MAX 条的定时表，满则计入 errors
+     CANCEL                     清空定时表
+     ATTRACT ms                 待机跑马灯：每 ms 毫秒点亮下一个 GAME LED，树莓派无需参与
+                                ATTRACT 0 停止并熄灭；SCAN 模式下任一按键按下也会立即停止
    （指令索引为 0-base，如需 1-base 将 toggleBank 内 idx-=1）
+
+   回传给树莓派（换行结尾）：
+     Ready                      开机 / 复位
+     K<n>                       已从 RX 缓冲取走 n 字节（信用额度归还）
+     S free minFree applied errors uptime_ms queued   每秒状态帧
+     T us                       SYNC 的应答：处理该指令时的 micros()
+     B<hh..>                    去抖后的按键位掩码（十六进制，(按键数+3)/4 位，变化时发送）
+
+   解析：serialEvent() 只把字节搬进固定 64 字节环形缓冲，loop() 每轮最多解析
+   PARSE_BUDGET 字节，交给 CmdParser.h 的状态机（无 String / 无堆分配），
+   按动词哈希 switch 分发。主机端基准测试见 Test/host/。
 */
+#include "CmdParser.h"
+
 const int gameLed[8] = {2,3,4,5,6,7,8,9};
 const int waitLed[4] = {10,11,12,13};
 const int pumpPin[8] = {22,23,24,25,26,27,28,29};
+const int btnPin[8]  = {30,31,32,33,34,35,36,37};
+#define COUNT(a) (sizeof(a)/sizeof(a[0]))
+const byte N_GAME = COUNT(gameLed), N_WAIT = COUNT(waitLed);
+const byte N_PUMP = COUNT(pumpPin), N_BTN  = COUNT(btnPin);
+static_assert(N_GAME <= 32 && N_WAIT <= 32 && N_PUMP <= 32 && N_BTN <= 32,
+              "masks are uint32_t");
+
+const byte          PARSE_BUDGET = 16;   // 每轮 loop() 最多解析的字节数
+const byte          ACK_BATCH  = 16;     // 攒够 16 字节或空闲 5 ms 再回 K
+const unsigned long ACK_IDLE   = 5;
+const unsigned long STATUS_MS  = 1000;
+const unsigned long DEBOUNCE_MS = 10;    // 按键需稳定 10 ms
+const byte          SCHED_MAX  = 32;
+
+bool handleCmd(const cmd::Command& c);
+void toggleBank(const int* arr,int len,uint32_t idx,int state);
+
+struct Bank {
+  const int* pins; byte len;
+  volatile uint8_t* port;                // 非空 → 整组可一次写端口
+  byte shift;                            // 组在端口中的起始位
+};
+Bank gameBank = {gameLed, N_GAME, 0, 0};
+Bank waitBank = {waitLed, N_WAIT, 0, 0};
+Bank pumpBank = {pumpPin, N_PUMP, 0, 0};
+void initBank(Bank& b);
+void writeBank(const Bank& b, uint32_t mask);
+void setScan(uint32_t on);
+bool schedule(uint32_t t, uint32_t bank, uint32_t mask);
+void runSchedule();
+void setAttract(uint32_t ms);
+void runAttract(unsigned long now);
+void scanButtons(unsigned long now);
+void sendAck();
+void sendStatus();
 
-String inBuf;
+cmd::RingBuf<64> rx;                     // serialEvent → loop 的固定缓冲
+cmd::Parser   parser(handleCmd);         // applied / errors 计数在 parser 内
+unsigned int  rxPending  = 0;            // 未确认的已解析字节
+unsigned long lastRx     = 0;
+unsigned long lastStatus = 0;
+int           minFree    = SERIAL_RX_BUFFER_SIZE;
+
+bool          scanning   = false;
+uint32_t      rawMask    = 0;            // 上次原始读数
+uint32_t      btnMask    = 0;            // 去抖后的稳定状态
+uint32_t      targetMask = 0;
+unsigned long rawSince   = 0;
+
+struct Timed { uint32_t t; byte bank; uint32_t mask; };
+Timed sched[SCHED_MAX];                   // 按时间降序：最早到期的在末尾，出队 O(1)
+byte  schedLen = 0;
+Bank* const schedBanks[3] = {&gameBank, &waitBank, &pumpBank};
+
+unsigned long attractMs  = 0;            // 0 = 关闭
+unsigned long attractAt  = 0;
+byte          attractPos = 0;
 
 void setup() {
   Serial.begin(9600);
 
-  for (int i=0;i<8;i++){ pinMode(gameLed[i],OUTPUT); digitalWrite(gameLed[i],LOW);}
-  for (int i=0;i<4;i++){ pinMode(waitLed[i],OUTPUT); digitalWrite(waitLed[i],LOW);}
-  for (int i=0;i<8;i++){ pinMode(pumpPin[i],OUTPUT); digitalWrite(pumpPin[i],LOW);}
+  for (byte i=0;i<N_GAME;i++){ pinMode(gameLed[i],OUTPUT); digitalWrite(gameLed[i],LOW);}
+  for (byte i=0;i<N_WAIT;i++){ pinMode(waitLed[i],OUTPUT); digitalWrite(waitLed[i],LOW);}
+  for (byte i=0;i<N_PUMP;i++){ pinMode(pumpPin[i],OUTPUT); digitalWrite(pumpPin[i],LOW);}
+  for (byte i=0;i<N_BTN;i++) { pinMode(btnPin[i],INPUT_PULLUP);}
+  initBank(gameBank); initBank(waitBank); initBank(pumpBank);
 
-  inBuf.reserve(40);
   Serial.println("Ready");
 }
 
-void loop() { /* 空循环，所有解析工作在 serialEvent() 完成 */ }
+void loop() {
+  runSchedule();                           // 先跑到期项，保证亚毫秒精度
+  unsigned long now = millis();
+  for (byte n=0; n<PARSE_BUDGET && rx.size(); n++) {
+    parser.feed(rx.pop());
+    rxPending++; lastRx = now;
+    if (rxPending >= ACK_BATCH) sendAck();
+  }
+  if (rxPending && now - lastRx >= ACK_IDLE) sendAck();     // 尾部零头
+  if (now - lastStatus >= STATUS_MS) { lastStatus = now; sendStatus(); }
+  if (scanning) scanButtons(now);
+  runAttract(now);
+}
+
+void scanButtons(unsigned long now) {
+  uint32_t raw = 0;
+  for (byte i=0;i<N_BTN;i++) if (digitalRead(btnPin[i])==LOW) raw |= 1UL<<i;
+  if (raw != rawMask) { rawMask = raw; rawSince = now; return; }
+  if (raw == btnMask || now - rawSince < DEBOUNCE_MS) return;
+
+  uint32_t hit = raw & ~btnMask & targetMask;  // 新按下且是目标：本地立即反馈
+  for (byte i=0;i<N_BTN;i++) if (hit & (1UL<<i)) {
+    if (i >= N_GAME || i >= N_PUMP) break;
+    digitalWrite(gameLed[i], HIGH);
+    digitalWrite(pumpPin[i], HIGH);
+  }
+  btnMask = raw;
+  if (attractMs && btnMask) setAttract(0);   // 一帧之内唤醒，不等树莓派
+  Serial.print('B');                         // 定宽十六进制，补前导零
+  for (int8_t d=(N_BTN+3)/4-1; d>0; d--) if (btnMask < (1UL<<(4*d))) Serial.print('0');
+  Serial.println(btnMask, HEX);
+}
+
+int freeBytes() {                           // 信用窗口视角：尚未解析的字节之外的空间
+  return SERIAL_RX_BUFFER_SIZE - Serial.available() - rx.size();
+}
+
+void serialEvent() {                        // 只搬运，不解析
+  int freeNow = freeBytes();
+  if (freeNow < minFree) minFree = freeNow;
+  while (Serial.available() && rx.space()) rx.push(Serial.read());
+}
+
+void sendAck() {
+  Serial.print('K'); Serial.println(rxPending);
+  rxPending = 0;
+}
+
+void sendStatus() {
+  Serial.print("S ");
+  Serial.print(freeBytes());      Serial.print(' ');
+  Serial.print(minFree);          Serial.print(' ');
+  Serial.print(parser.applied);   Serial.print(' ');
+  Serial.print(parser.errors);    Serial.print(' ');
+  Serial.print(millis());         Serial.print(' ');
+  Serial.println(schedLen);
+  minFree = SERIAL_RX_BUFFER_SIZE;
+}
 
-void serialEvent() {                        // 立即处理每一行
-  while (Serial.available()) {
-    char c = Serial.read();
-    if (c=='\n' || c=='\r') {               // 行结束
-      if (inBuf.length()) {
-        handleCmd(inBuf);
-        inBuf="";                           // 清空缓冲
-      }
-    } else {
-      inBuf += c;
-    }
+bool handleCmd(const cmd::Command& c) {    // false → parser 计入 errors
+  switch (c.verb) {                        // 无参数指令
+    case cmd::hash("SYNC"):   Serial.print("T "); Serial.println(micros()); return true;
+    case cmd::hash("CANCEL"): schedLen = 0; return true;
+    case cmd::hash("AT"):     return c.argc == 3 && schedule(c.argv[0], c.argv[1], c.argv[2]);
   }
+  if (c.argc < 1) return false;
+  uint32_t a = c.argv[0];
+  switch (c.verb) {
+    case cmd::hash("LED_ON"):   toggleBank(gameLed,N_GAME,a,HIGH); break;
+    case cmd::hash("LED_OFF"):  toggleBank(gameLed,N_GAME,a,LOW);  break;
+
+    case cmd::hash("WAIT_ON"):  toggleBank(waitLed,N_WAIT,a,HIGH); break;
+    case cmd::hash("WAIT_OFF"): toggleBank(waitLed,N_WAIT,a,LOW);  break;
+
+    case cmd::hash("PUMP_ON"):  toggleBank(pumpPin,N_PUMP,a,HIGH); break;
+    case cmd::hash("PUMP_OFF"): toggleBank(pumpPin,N_PUMP,a,LOW);  break;
+
+    case cmd::hash("LEDS"):     writeBank(gameBank,a); break;
+    case cmd::hash("WAITS"):    writeBank(waitBank,a); break;
+    case cmd::hash("PUMPS"):    writeBank(pumpBank,a); break;
+
+    case cmd::hash("ATTRACT"):  setAttract(a); break;
+    case cmd::hash("SCAN"):     setScan(a); break;
+    case cmd::hash("TARGET"):   targetMask = a; break;
+
+    default: return false;
+  }
+  return true;
 }
 
-void handleCmd(String s) {
-  s.trim();
-  if      (s.startsWith("LED_ON "))   toggleBank(gameLed ,8 ,s.substring(7).toInt(), HIGH);
-  else if (s.startsWith("LED_OFF "))  toggleBank(gameLed ,8 ,s.substring(8).toInt(), LOW);
+void setScan(uint32_t on) {
+  scanning = on;
+  rawMask = btnMask = 0;                   // 下一次扫描会重新上报当前状态
+  rawSince = millis();
+  if (!on) targetMask = 0;
+}
+
+void toggleBank(const int* arr,int len,uint32_t idx,int state) {
+  if (idx<(uint32_t)len) digitalWrite(arr[idx], state);
+}
 
-  else if (s.startsWith("WAIT_ON "))  toggleBank(waitLed ,4 ,s.substring(8).toInt(), HIGH);
-  else if (s.startsWith("WAIT_OFF ")) toggleBank(waitLed ,4 ,s.substring(9).toInt(), LOW);
+void initBank(Bank& b) {                   // 检查整组是否落在同一端口的连续位上
+  uint8_t port = digitalPinToPort(b.pins[0]);
+  uint8_t bit0 = digitalPinToBitMask(b.pins[0]);
+  byte shift = 0;
+  while (shift < 8 && bit0 != (1<<shift)) shift++;
+  if (port == NOT_A_PIN || shift + b.len > 8) return;
+  for (byte i=1;i<b.len;i++)
+    if (digitalPinToPort(b.pins[i]) != port ||
+        digitalPinToBitMask(b.pins[i]) != (1<<(shift+i))) return;
+  b.port  = portOutputRegister(port);
+  b.shift = shift;
+}
+
+void writeBank(const Bank& b, uint32_t mask) {
+  if (!b.port) {                           // 引脚分散：逐脚回退
+    for (byte i=0;i<b.len;i++) digitalWrite(b.pins[i], (mask>>i)&1 ? HIGH : LOW);
+    return;
+  }
+  if (b.len == 8) { *b.port = (uint8_t)mask; return; }   // 整个端口：单条 STS 指令
+  uint8_t m = ((1<<b.len)-1) << b.shift;
+  uint8_t oldSREG = SREG; cli();           // 半个端口：读-改-写期间关中断
+  *b.port = (*b.port & ~m) | ((uint8_t)(mask << b.shift) & m);
+  SREG = oldSREG;
+}
+
+bool schedule(uint32_t t, uint32_t bank, uint32_t mask) {
+  if (bank > 2 || schedLen == SCHED_MAX) return false;
+  uint32_t now = micros();
+  byte i = schedLen++;                     // 插入排序：比 t 更早到期的往后挪
+  while (i > 0 && (int32_t)(sched[i-1].t - now) < (int32_t)(t - now)) {
+    sched[i] = sched[i-1]; i--;
+  }
+  sched[i].t = t; sched[i].bank = bank; sched[i].mask = mask;
+  return true;
+}
+
+void runSchedule() {
+  while (schedLen && (int32_t)(micros() - sched[schedLen-1].t) >= 0) {
+    const Timed& e = sched[--schedLen];
+    writeBank(*schedBanks[e.bank], e.mask);
+  }
+}
 
-  else if (s.startsWith("PUMP_ON "))  toggleBank(pumpPin,8 ,s.substring(8).toInt(), HIGH);
-  else if (s.startsWith("PUMP_OFF ")) toggleBank(pumpPin,8 ,s.substring(9).toInt(), LOW);
+void setAttract(uint32_t ms) {
+  attractMs = ms; attractPos = 0;
+  attractAt = millis() - ms;               // 立即显示第一帧
+  if (!ms) writeBank(gameBank, 0);
 }
 
-void toggleBank(const int* arr,int len,int idx,int state) {
-  if (idx>=0 && idx<len) digitalWrite(arr[idx], state);
+void runAttract(unsigned long now) {
+  if (!attractMs || now - attractAt < attractMs) return;
+  attractAt = now;
+  writeBank(gameBank, 1UL << attractPos);
+  attractPos = (attractPos + 1) % gameBank.len;
 }
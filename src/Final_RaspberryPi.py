@@ -1,166 +1,408 @@
 #!/usr/bin/env python3
 """
 Raspberry Pi master:
- – 8 GPIO buttons
- – Talks to Arduino Mega 2560 Pro via /dev/ttyUSB0 9600 bps
- – Uses threaded audio so music never blocks button reads
+ – 8 buttons on Pi GPIO, or on Arduino D30-D37 with BUTTON_SOURCE = "arduino",
+   or 16 per MCP23017 expander on I2C with BUTTON_SOURCE = "mcp23017"
+ – Talks to Arduino Mega 2560 Pro via /dev/ttyUSB0 9600 bps; list more ports in
+   SERIAL_PORTS for a bigger floor, each board drives the next 8 tiles (shards.py)
+ – Tile sets (targets, presses, hits) are int bit masks, bit i = tile i, so the
+   per-tick work does not grow with the number of tiles
+ – Firmware protocol is auto-detected at connect (see protocols.py); older
+   Test/ sketches still work with whatever outputs they support
+ – Serial writes are credit-limited by the Mega's acks (see serial_link.py)
+ – Demo sprays are pre-sent as time-tagged AT commands on a synced clock
+ – Idle attract animation runs on the Mega; the Pi sleeps on a button edge
+ – All state timing runs on deadline tickers (ticker.py), not bare sleeps
+ – Uses threaded audio so music never blocks button reads; rmb.wav loops as a
+   background bed under prioritized, overlapping voices (mixer.py)
+ – Every correct press plays its tile's tone, wrong presses buzz, cleared steps
+   chime; all synthesized into mixer buffers at startup (tones.py)
+ – Win / stage-clear shows follow each track's beats and onsets, read from the
+   cache built offline by audio_analysis.py (run it after changing any tracks)
+ – Sounds come from theme packs (music/, src/HP/, see themes.py); with several
+   in THEMES the next one is decoded in the background every THEME_EVERY
+   sessions and swapped in when a session starts while no other lane is in one
+ – PIPELINE = True splits input / game / output+audio into processes (pipeline.py)
+ – Every session and step is recorded in sessions.db (session_store.py)
+ – After a wrong press RETRY_MODE decides what is demoed and replayed (retry_policy.py)
+ – Waiting window, demo, stage gaps and celebration shrink when there is a
+   queue and stretch back when it is quiet (pacing.py, PACE_SWITCH_PIN)
+ – Steps are drawn from precomputed tables of all k-tile masks, weighted to
+   spread the group out and never repeating the previous step (sequences.py)
+ – While the win show runs the next session is prepared: stage-1 audio warmed,
+   a sequence drawn for every player count (background thread), banks reset
+ – LANES > 1 splits the floor into blocks that each run their own game (Lane),
+   merged into one output frame; each lane's sounds use their own mixer channel
  – WAIT-state player LEDs are the four extra LEDs on Arduino D10-D13
- – GAME LEDs are on Arduino D2-D9
+ – GAME LEDs are on Arduino D2-D9, or on a PCA9685 with LED_BACKEND = "pca9685"
  – Pumps on Arduino D22-D29 (index 0-7)
 """
 
-import os, threading, time, serial, pygame
-from random import sample
-from gpiozero import Button
+import threading, time
+import audio
+from hardware import open_boards, SERIAL_PORT
+from protocols import PUMP
+from button_input import GpioButtons, ArduinoButtons, MergedButtons
+from clock_sync import ClockSync
+from shards import ShardedClock
+from ticker import Ticker, report as timing_report
+from session_store import SessionStore
+import audio_analysis
+from retry_policy import RetryPolicy
+from lanes import Floor
+from pacing import Pacer
+from sequences import SequenceEngine
+from masks import bits, tick
+from themes import discover, DEFAULT as DEFAULT_THEME
 
 # ------------------ GPIO ------------------
 BUTTON_PINS = [17, 27, 22, 5, 6, 26, 16, 24]        # 8 buttons
-buttons = [Button(pin, pull_up=True) for pin in BUTTON_PINS]
-
-# ---------------- Serial ------------------
-ser = serial.Serial('/dev/ttyUSB0', 9600, timeout=1)
-time.sleep(2)              # give Arduino time to reset
-
-def send(cmd: str):
-    """Send a '\n'-terminated textual command to Arduino."""
-    ser.write((cmd + '\n').encode())
-
-# helpers
-def game_led(idx, on):   send(f"LED_{'ON' if on else 'OFF'} {idx}")
-def wait_led(idx, on):   send(f"WAIT_{'ON' if on else 'OFF'} {idx}")
-def pump(idx, on):       send(f"PUMP_{'ON' if on else 'OFF'} {idx}")
-
-# ---------------- Audio -------------------
-pygame.mixer.init()
-
-def play_sound_async(filename: str):
-    """Interrupt any current track and start new one in a thread."""
-    def _worker(path):
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.play()
-        except Exception as e:
-            print("Audio error:", e)
-    path = os.path.join("allure", filename)
-    threading.Thread(target=_worker, args=(path,), daemon=True).start()
-
-# -------------- Utilities ----------------
-def pressed_indices():
-    return [i for i, b in enumerate(buttons) if b.is_pressed]
-
-# -------------- Game Globals -------------
-genarr       = []   # 2-D steps list
-player_count = 1
-stepnum      = 0
-step_size    = 0
+BUTTON_SOURCE = "gpio"     # "arduino": Mega scans + debounces, lights hits locally
+                           # "mcp23017": expanders, read in one burst on their INT edge
+MCP_EXPANDERS = [(0x20, 23)]   # (I2C address, BCM pin of the shared INT line)
+LED_BACKEND   = "arduino"  # "pca9685": game LEDs on I2C, one block write per frame
+PCA_CHANNELS  = [5, 6, 7, 8, 9, 10, 11, 12]
+SERIAL_PORTS  = [SERIAL_PORT]  # one Mega per 8 tiles, in floor order
+PIPELINE      = False      # True: input / game / output+audio in separate processes
+RETRY_MODE    = "resume"   # after a wrong press: "resume" | "rollback" | "restart"
+RETRY_ROLLBACK = 1         # steps to go back in "rollback" mode
+LANES         = 1          # 2: two independent games on tiles 1-4 and 5-8 (lanes.py)
+PACE_SWITCH_PIN = None     # BCM pin of a "queue!" toggle switch, None = automatic only
+PLAYERS_SETTLE_S = 0.8     # player count is final once no one stepped on/off this long
+SEQUENCE_SEED = None       # int: replay the same sequences (lane k uses seed + k)
+THEMES        = ["music"]  # sound packs to take turns with, by directory: "music", "HP"
+THEME_EVERY   = 20         # sessions before moving on to the next pack
 
-# -------------- States -------------------
-def code_state():
-    print("\nCODE STATE → waiting for first press")
-    prev = any(pressed_indices())
-    while True:
-        for i in range(8):
-            game_led(i, True); time.sleep(0.15); game_led(i, False)
-            cur = any(pressed_indices())
-            if cur and not prev:           # rising edge
-                for j in range(8): game_led(j, False)
-                return
-            prev = cur
-
-def waiting_state():
-    global player_count
-    cycles, dt = 40, 0.05                 # ≈2 s total
-    player_count = 1
-
-    for _ in range(cycles):
-        now = pressed_indices()
-        live = len(now) if now else 1
-        if live != player_count:
-            player_count = live
-            # update 4 waiting LEDs (cap at 4)
-            for i in range(4):
-                wait_led(i, i < player_count)
-        time.sleep(dt)
-
-    # clear wait LEDs
-    for i in range(4): wait_led(i, False)
-    print("Players detected:", player_count)
-
-def generate_state():
-    global genarr, stepnum, step_size
-    genarr.clear()
-    if player_count > 5:
-        stepnum, step_size = 3, 5
+if PIPELINE:
+    # ------------- Pipeline ---------------
+    from pipeline import Pipeline
+    if BUTTON_SOURCE != "gpio":           # the input stage only reads BUTTON_PINS
+        print(f"PIPELINE cannot read buttons from {BUTTON_SOURCE}, using GPIO")
+    pipe = Pipeline(BUTTON_PINS, SERIAL_PORTS, LED_BACKEND, PCA_CHANNELS, THEMES[0])
+    proto, out, buttons, clock = pipe.proto, pipe.outputs, pipe.buttons, pipe.clock
+    play_sound_async, health = out.play, pipe.health
+    prewarm_sound, play_tone = out.prewarm, out.tone
+    select_theme, swap_theme = out.select_theme, pipe.swap_theme  # swap: confirmed
+else:
+    # ------------- Serial -----------------
+    links, proto, out = open_boards(SERIAL_PORTS, LED_BACKEND, PCA_CHANNELS)
+    health = lambda: [link.health() for link in links]
+
+    def sender(link):
+        """'\n'-terminated textual commands to one Arduino (fountain firmware only)."""
+        return lambda cmd: link.write((cmd + '\n').encode())
+    sends = [sender(link) for link in links]
+
+    clock = None
+    if proto.timed:
+        clocks = [ClockSync(link, send) for link, send in zip(links, sends)]
+        clock = clocks[0] if len(clocks) == 1 else ShardedClock(clocks, out)
+
+    if BUTTON_SOURCE == "arduino" and not proto.scan:
+        print("Firmware cannot scan buttons, using GPIO")
+    if BUTTON_SOURCE == "arduino" and proto.scan:
+        boards = [ArduinoButtons(link, send) for link, send in zip(links, sends)]
+        buttons = boards[0] if len(boards) == 1 else MergedButtons(
+            [(b, out.n // len(boards)) for b in boards])
+    elif BUTTON_SOURCE == "mcp23017":
+        from mcp23017_in import MCP23017Buttons
+        buttons = MCP23017Buttons.from_board(MCP_EXPANDERS)
     else:
-        stepnum, step_size = 8 - player_count, player_count
-    for _ in range(stepnum):
-        genarr.append(sample(range(8), step_size))
-    print("Sequence:", [[n+1 for n in s] for s in genarr])
-
-def water_state():
-    print("WATER STATE → demo spray each step")
-    for step in genarr:
-        for i in step: pump(i, True)
-        time.sleep(1)
-        for i in step: pump(i, False)
-        time.sleep(0.7)
-
-def play_state():
-    for stage, targets in enumerate(genarr, start=1):
-        triggered = [False]*8
-        print(f"PLAY STATE step {stage}", [n+1 for n in targets])
+        buttons = GpioButtons(BUTTON_PINS)
+
+    # ------------- Audio ------------------
+    audio.init(THEMES[0])
+    play_sound_async = audio.play_sound_async
+    select_theme, swap_theme = audio.select, audio.swap
+    prewarm_sound = audio.prewarm
+    from tones import ToneBank
+    tones = ToneBank(out.n)
+    play_tone = tones.play
+    print(f"Tone bank: {len(tones.sounds)} sounds, {tones.bytes / 1024:.0f} KiB, "
+          f"rendered in {tones.render_ms:.0f} ms, press → sound ≤ {tones.latency_ms():.1f} ms")
+
+SCHED_LEAD = 0.15          # s between queuing a sequence and its first event
+store = SessionStore()
+retry = RetryPolicy(RETRY_MODE, RETRY_ROLLBACK)
+pacer = Pacer(PACE_SWITCH_PIN)
+packs = discover()         # per theme; tracks a pack lacks come from the default one
+SHOWS = {name: audio_analysis.load([packs[name], packs[DEFAULT_THEME]])
+         for name in THEMES}                    # mmaps the cache, never analyses
+theme, theme_next, theme_sessions = THEMES[0], None, 0
+theme_active = 0           # lanes between theme_session_start() and theme_session_end()
+theme_lock = threading.Lock()
+
+def theme_session_end():
+    """A lane's session is over. Once a pack has had its THEME_EVERY sessions,
+    start decoding the next one."""
+    global theme_next, theme_sessions, theme_active
+    with theme_lock:
+        theme_active -= 1
+        theme_sessions += 1
+        if len(THEMES) > 1 and theme_sessions % THEME_EVERY == 0:
+            theme_next = THEMES[theme_sessions // THEME_EVERY % len(THEMES)]
+            select_theme(theme_next)
+
+def theme_session_start():
+    """A lane's session begins → the pack to play it with. The pack and bed are
+    shared by every lane, so the next one is swapped in only while no other lane
+    is mid-session, and only once the audio side reports it playing."""
+    global theme, theme_next, theme_active
+    with theme_lock:
+        if theme_next and not theme_active:
+            theme = swap_theme() or theme   # None: pipeline did not answer, nothing known
+            if theme == theme_next:         # else not decoded yet: try again next session
+                theme_next = None
+        theme_active += 1
+        return theme
+
+# -------------- States -------------------
+MARQUEE_S = 0.15
+
+class Lane:
+    """One game: the whole floor, or one block of tiles with LANES > 1."""
+
+    def __init__(self, buttons, out, clock=None, channel=None, name="", waits=4):
+        self.buttons, self.clock, self.channel, self.waits = buttons, clock, channel, waits
+        self.tag = f"[{name}] " if name else ""
+        self.native_attract = (LED_BACKEND == "arduino" and proto.attract
+                               and hasattr(out, "attract"))
+        self.out = out
+        # helpers: precomputed bytes per protocol; banks are bit masks, bit i = index i
+        self.game_led, self.wait_led, self.pump    = out.game_led, out.wait_led, out.pump
+        self.game_leds, self.wait_leds, self.pumps = out.game_leds, out.wait_leds, out.pumps
+        self.N   = out.n           # tiles in this lane
+        self.ALL = (1 << self.N) - 1
+        # game state
+        self.genarr       = []     # steps, each a target bit mask
+        self.player_count = 1
+        self.stepnum      = 0
+        self.step_size    = 0
+        self.session      = None   # session_store id of the current group
+        self.attempt      = 0      # water/play rounds so far this session
+        self.pace         = pacer.timing()   # durations, fixed for the whole session
+        self.started      = 0.0
+        self.ready        = {}     # player count → (stepnum, step_size, steps), see prepare()
+        self.shows        = SHOWS[theme]     # analysed tracks of the session's theme
+        self.sequences    = SequenceEngine(self.N, seed=None if SEQUENCE_SEED is None
+                                           else SEQUENCE_SEED + (channel or 0))
+
+    def log(self, *args):
+        print(self.tag + " ".join(map(str, args)))
+
+    def play(self, track):
+        play_sound_async(track, self.channel)
+
+    def code_state(self):
+        buttons = self.buttons
+        print()
+        self.log("CODE STATE → waiting for first press")
+        t0, cpu0 = time.monotonic(), time.process_time()
+        if self.started:                       # extra people already on tiles = a queue
+            pacer.note_queue(max(0, buttons.mask().bit_count() - self.player_count))
+        buttons.wait_for(lambda m: not m)      # rising edge only: let the last group step off
+        if self.native_attract:
+            self.out.attract(int(MARQUEE_S * 1000))
+            buttons.wait_for(bool)             # blocks on edges, no polling
+            self.out.attract(0)
+        else:                                  # animate from here, still woken by the edge
+            marquee, i = Ticker("marquee", MARQUEE_S), 0
+            while True:
+                self.game_leds(1 << i)
+                i = (i + 1) % self.N
+                if marquee.wait(lambda t: buttons.wait_for(bool, t)):
+                    break
+            self.game_leds(0)
+        woke = time.monotonic()
+        idle = max(woke - t0, 1e-3)
+        wake_ms = (woke - buttons.last_edge) * 1000 if buttons.last_edge else 0
+        pacer.note_gap(idle)
+        self.pace, self.started = pacer.timing(), woke
+        self.shows = SHOWS[theme_session_start()]
+        self.log(f"Idle {idle:.0f} s, CPU {(time.process_time() - cpu0) / idle * 100:.2f} %, "
+                 f"wake-up {wake_ms:.1f} ms after the press")
+
+    def waiting_state(self):
+        shown = 0
 
+        def show(mask):                       # one write per change of the lit LEDs
+            nonlocal shown
+            leds = (1 << min(mask.bit_count() or 1, self.waits)) - 1
+            if leds != shown:
+                self.wait_leds(leds)
+                shown = leds
+
+        # ends as soon as the tiles held stay put; never later than 2 s (quiet pace)
+        mask, took = self.buttons.wait_stable(PLAYERS_SETTLE_S, self.pace['waiting'],
+                                              on_settled=show)
+        self.player_count = mask.bit_count() or 1
+
+        # clear wait LEDs
+        self.wait_leds(0)
+        self.log(f"Players detected: {self.player_count} after {took:.2f} s")
+
+    def make_sequence(self, players):
+        """→ (stepnum, step_size, steps) for a group of this size."""
+        N = self.N
+        # 8 tiles: 1-5 players → 7-3 steps of one tile each, more → 3 steps of 5;
+        # bigger floors allow bigger groups but keep the session length
+        big = max(5, N * 5 // 8)
+        if players > big:
+            stepnum, step_size = 3, big
+        else:
+            stepnum, step_size = max(3, 8 - players), min(players, N)
+        return stepnum, step_size, self.sequences.sequence(stepnum, step_size)
+
+    def prepare(self):
+        """Sequences for every group size the next session may see. No output calls:
+        they belong to the session, and stay in the order the lane issues them."""
+        self.ready = {p: self.make_sequence(p) for p in range(1, self.N + 1)}
+
+    def generate_state(self):
+        t0, players = time.monotonic(), self.player_count
+        ready, self.ready = self.ready, {}    # every sequence is used at most once
+        plan = ready.get(players) or self.make_sequence(players)
+        self.stepnum, self.step_size, self.genarr = plan
+        self.log("Sequence:", [[n+1 for n in bits(s)] for s in self.genarr],
+                 f"({'ready' if players in ready else 'drawn'} in "
+                 f"{(time.monotonic() - t0) * 1000:.2f} ms)")
+        self.session, self.attempt = store.begin(players, self.genarr, str(retry)), 0
+
+    def water_state(self, steps):
+        self.log(f"WATER STATE → demo spray {len(steps)} step(s)")
+        clock, pumps = self.clock, self.pumps
+        on, every = self.pace['demo_on'], self.pace['demo_step']   # 1 s / 1.7 s when quiet
+        if not (clock and clock.sync()):       # no SYNC support: time it on the Pi
+            demo = Ticker("water")
+            for k, step in enumerate(steps):
+                demo.at(k * every)
+                pumps(step)
+                demo.at(k * every + on)
+                pumps(0)
+            demo.at(len(steps) * every)
+            return
+        # queue the whole demo up front; the Mega plays it from micros()
+        demo = Ticker("water")
+        t = demo.start + SCHED_LEAD
+        for step in steps:
+            clock.at(t,      PUMP, step)
+            clock.at(t + on, PUMP, 0)
+            t += every
+        demo.at(t - demo.start)
+
+    def play_state(self, start=0):
+        """Play from step index start; None when cleared, else the failed step's index."""
+        buttons, session = self.buttons, self.session
+        self.attempt += 1
+        attempt = self.attempt
+        for stage, targets in enumerate(self.genarr[start:], start=start + 1):
+            hit  = 0                              # targets pressed so far
+            seen = 0                              # mask at the previous wake, for press events
+            t_step = time.monotonic()
+            self.log(f"PLAY STATE step {stage}", [n+1 for n in bits(targets)])
+            buttons.set_target(targets)
+
+            while True:
+                pressed = buttons.mask()
+                presses, wrong, new = tick(targets, pressed, hit, seen)
+                for idx in presses:
+                    store.press(session, attempt, stage, idx,
+                                time.monotonic() - t_step, bool(targets >> idx & 1))
+                seen = pressed
+
+                # wrong press?
+                if wrong:
+                    idx = (wrong & -wrong).bit_length() - 1
+                    play_tone("error")
+                    self.log("Wrong:", idx+1)
+                    store.step(session, attempt, stage, targets, time.monotonic() - t_step, idx)
+                    buttons.set_target(0)
+                    flash = Ticker("wrong flash", 0.2)
+                    for k in range(10):
+                        self.game_led(idx, k % 2 == 0)
+                        flash.wait()
+                    self.game_leds(0); self.pumps(0)
+                    return stage - 1
+
+                # correct presses: one bank write for all new hits
+                if new:
+                    for idx in bits(new):
+                        play_tone(idx)
+                    hit |= new
+                    if not buttons.local_feedback:       # Mega already lit them
+                        self.game_leds(hit); self.pumps(hit)
+
+                if hit == targets:
+                    play_tone("success")
+                    store.step(session, attempt, stage, targets, time.monotonic() - t_step)
+                    gap = Ticker("stage gap")
+                    buttons.set_target(0)
+                    track = f"p{stage}.wav"
+                    self.play(track)
+                    length = self.pace['gap']
+                    if track in self.shows:          # pumps of this step pulse to the music
+                        for t, m in audio_analysis.light_show(self.shows[track], length,
+                                                              targets, self.N):
+                            gap.at(t)
+                            self.pumps(m)
+                    gap.at(length)
+                    self.game_leds(0); self.pumps(0)
+                    break
+
+                buttons.wait_change(0.05)        # wake early on a press
+        return None
+
+    def win_state(self):
+        self.log("WIN STATE")
+        store.end(self.session, self.attempt, pace=pacer.current())
+        prep = threading.Thread(target=self.prepare, daemon=True)
+        prep.start()
+        self.play("p8.wav")
+        prewarm_sound("p1.wav", self.channel)
+        ALL, length = self.ALL, self.pace['win']
+        if "p8.wav" in self.shows:            # 10 s (quiet) on the track's beats and onsets
+            frames = audio_analysis.light_show(self.shows["p8.wav"], length, ALL, self.N)
+        else:                                 # not analysed: fixed 0.5 s blink
+            frames = [(k * 0.5, ALL if k % 2 == 0 else 0) for k in range(int(length / 0.5))]
+        show = Ticker("win show")
+        for t, on in frames:
+            show.at(t)
+            self.game_leds(on); self.pumps(on)
+        show.at(length)
+        self.game_leds(0); self.pumps(0); self.wait_leds(0)   # known state for attract
+        theme_session_end()
+        t = time.monotonic()
+        prep.join()
+        self.log(f"Next session ready {(time.monotonic() - t) * 1000:.1f} ms after the show")
+        self.log(f"Session {time.monotonic() - self.started:.1f} s,",
+                 pacer.session_done(self.player_count))
+        self.log("Link health:", health())
+        print(timing_report())
+
+    def run(self):
+        self.log("Sequence seed:", self.sequences.seed)
+        self.prepare()
         while True:
-            pressed = pressed_indices()
-
-            # wrong press?
-            wrong = [idx for idx in pressed if idx not in targets]
-            if wrong:
-                idx = wrong[0]
-                print("Wrong:", idx+1)
-                for _ in range(5):
-                    game_led(idx, True);  time.sleep(0.2)
-                    game_led(idx, False); time.sleep(0.2)
-                for i in range(8): game_led(i, False); pump(i, False)
-                return False
-
-            # correct presses
-            for idx in targets:
-                if idx in pressed and not triggered[idx]:
-                    game_led(idx, True)
-                    pump(idx, True)
-                    triggered[idx] = True
-
-            if all(triggered[i] for i in targets):
-                play_sound_async(f"p{stage}.wav")
-                time.sleep(0.5)
-                for idx in targets:
-                    game_led(idx, False); pump(idx, False)
-                break
-
-            time.sleep(0.05)
-    return True
-
-def win_state():
-    print("WIN STATE")
-    play_sound_async("p8.wav")
-    t0 = time.time()
-    while time.time()-t0 < 10:
-        for i in range(8): game_led(i, True); pump(i, True)
-        time.sleep(0.5)
-        for i in range(8): game_led(i, False); pump(i, False)
-        time.sleep(0.5)
+            self.code_state()
+            self.waiting_state()
+            self.generate_state()
+            start, demo = 0, slice(None)
+            while True:
+                self.water_state(self.genarr[demo])
+                failed = self.play_state(start)
+                if failed is None:
+                    self.win_state()
+                    break
+                start, demo = retry.plan(failed)
+                self.log(f"Retry ({retry}) from step {start + 1}")
 
 # -------------- Main Loop ---------------
-while True:
-    code_state()
-    waiting_state()
-    generate_state()
-    while True:
-        water_state()
-        if play_state():
-            win_state()
-            break
-        else:
-            print("Restarting from WATER STATE")
+if LANES == 1:
+    Lane(buttons, out, clock).run()
+else:                      # AT schedules and the Mega marquee are whole-bank: Pi-timed per lane
+    floor = Floor(out, buttons, LANES)
+    threads = [threading.Thread(daemon=True, target=Lane(
+                   b, o, channel=k, name=f"lane {k + 1}", waits=floor.wait_width).run)
+               for k, (b, o) in enumerate(floor.lanes)]
+    for t in threads: t.start()
+    for t in threads: t.join()
@@ -0,0 +1,81 @@
+"""
+Stage music and sound effects, all through the voice pool of mixer.py:
+ – tracks come from the current theme pack (themes.py), decoded into Sounds
+   before they are needed, so playing one never reads or decodes a file
+ – the pack's background bed (BACKGROUND, looped on the music stream) starts at
+   init() and is only ducked, never stopped, while tracks and stingers play over it
+ – a stage track replaces the previous track of the same lane (channel number,
+   None for the single-lane game) but no other sound
+ – select() preloads another pack in the background; swap() switches to it
+   between sessions once it is ready
+ – press tones and stingers (tones.py) go through the same pool as "press" /
+   "error" / "stage" voices
+"""
+
+import threading
+
+from themes import Themes, DEFAULT
+
+BACKGROUND = "rmb.wav"
+AUDIO_BUFFER = 256                  # frames: 5.8 ms at 44.1 kHz (pygame's default 512 is 11.6)
+MIXER_SIZE = -16                    # int16: half the resident size of the float32 tracks
+mixer = None                        # mixer.Mixer, after init()
+themes = None                       # themes.Themes, after init()
+
+
+def init(theme=DEFAULT):
+    global mixer, themes
+    import pygame
+    from mixer import Mixer
+    pygame.mixer.pre_init(44100, MIXER_SIZE, 2, AUDIO_BUFFER)
+    pygame.mixer.init()
+    mixer = Mixer()
+    themes = Themes()
+    pack = themes.load_now(theme)
+    print(f"Theme {pack.name}: {len(pack.sounds)} tracks decoded in {pack.load_s:.1f} s")
+    _background(pack)
+
+
+def _background(pack):
+    try:
+        mixer.music(pack.files[BACKGROUND])
+    except Exception as e:
+        print("Audio error:", e)
+
+
+def select(theme):
+    """Start decoding theme in the background while the current one plays."""
+    themes.preload(theme)
+
+
+def swap():
+    """Between sessions: → name of the pack in use (the selected one if it was ready)."""
+    old = themes.current
+    pack = themes.swap()
+    if pack is not old:
+        _background(pack)
+        print("Theme now", pack.name, [(n, f"{mib:.1f} MiB decoded", resident)
+                                       for n, _, mib, resident in themes.report()])
+    return pack.name
+
+
+def prewarm(filename: str, channel=None):
+    """In a thread: decode the track into the current pack if it is not there yet."""
+    pack = themes.current
+    if filename in pack.sounds:
+        return
+    def _worker():
+        try:
+            pack.sounds[filename] = pack.sound(filename)
+        except Exception as e:
+            print("Audio error:", e)
+    threading.Thread(target=_worker, daemon=True).start()
+
+
+def play_sound_async(filename: str, channel=None):
+    """Replace this lane's current track with a new one; never blocks on a file."""
+    sound = themes.current.sounds.get(filename)
+    if sound is None:
+        print("Audio error: no", filename, "in theme", themes.current.name)
+        return
+    mixer.play(sound, "stage", key=0 if channel is None else channel)
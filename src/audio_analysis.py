@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Offline analysis of the stage tracks for music-synced light/pump shows:
+ – per track: RMS envelope and spectral-flux onset strength per HOP samples,
+   picked onsets, tempo and a beat grid, all computed on whole-array NumPy
+ – results go to audio_cache/<sha1 of VERSION + file>/*.npy + meta.json, and
+   audio_cache/index.json maps each analysed path (size, mtime) to its hash
+ – run it after adding or changing tracks; the game never analyses:
+     python3 audio_analysis.py [dir ...]      (default: music/ and src/HP/)
+ – load() at start-up only stats the files and np.load(mmap_mode='r')s the cache;
+   light_show() turns a track into timed (t, mask) frames for the states
+"""
+
+import hashlib, json, math, os, sys
+import numpy as np
+
+from wavmap import WavMap, PCM, FLOAT
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TRACK_DIRS = [os.path.join(HERE, "..", "music"), os.path.join(HERE, "HP")]
+CACHE_DIR = os.path.join(HERE, "audio_cache")
+FRAME, HOP = 2048, 512
+BPM_RANGE = (60, 180)
+ARRAYS = ("rms", "flux", "onsets", "beats")
+VERSION = 2                                # part of the cache key: bump when analyze() changes
+
+
+# ---------------- WAV reading ----------------
+def read_wav(path):
+    """(rate, float32 samples × channels); PCM 16/24/32-bit int or 32-bit float.
+    Float files come back as a read-only view of the mapped file (wavmap.py)."""
+    wav = WavMap(path)
+    if wav.tag == FLOAT or (wav.tag == PCM and wav.bits in (16, 32)):
+        x = wav.array()
+        if wav.tag == PCM:
+            x = x / float(1 << (wav.bits - 1))
+    elif wav.tag == PCM and wav.bits == 24:
+        b = np.frombuffer(wav.pcm, np.uint8).reshape(-1, 3).astype(np.int32)
+        x = ((b[:, 0] | b[:, 1] << 8 | b[:, 2] << 16) << 8 >> 8) / float(1 << 23)
+    else:
+        raise ValueError(f"{path}: unsupported WAV format {wav.tag}/{wav.bits} bit")
+    return wav.rate, x.astype(np.float32, copy=False).reshape(wav.frames, wav.channels)
+
+
+# ---------------- Analysis ----------------
+def analyze(rate, samples):
+    """Envelope, onsets and beats of one track; times in seconds."""
+    mono = samples.mean(axis=1)
+    if len(mono) < FRAME:
+        mono = np.pad(mono, (0, FRAME - len(mono)))
+    frames = np.lib.stride_tricks.sliding_window_view(mono, FRAME)[::HOP]
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    spec = np.log1p(100 * np.abs(np.fft.rfft(frames * np.hanning(FRAME), axis=1)))
+    flux = np.concatenate([[0], np.maximum(np.diff(spec, axis=0), 0).sum(axis=1)])
+    flux /= flux.max() or 1
+    fps = rate / HOP
+
+    # onsets: local maxima over ±50 ms that stand above the local mean
+    w = max(1, int(0.05 * fps))
+    padded = np.pad(flux, w, mode="edge")
+    win = np.lib.stride_tricks.sliding_window_view(padded, 2 * w + 1)
+    peaks = (flux == win.max(axis=1)) & (flux > win.mean(axis=1) + 0.1)
+    onsets = np.flatnonzero(peaks)
+
+    # tempo: autocorrelation of the onset strength over the BPM range
+    lags = np.arange(max(1, math.ceil(fps * 60 / BPM_RANGE[1])), int(fps * 60 / BPM_RANGE[0]) + 1)
+    lags = lags[lags < len(flux)]
+    if len(lags):
+        f = flux - flux.mean()
+        ac = np.fft.irfft(np.abs(np.fft.rfft(f, 2 * len(f))) ** 2)[:len(f)]
+        lag = int(lags[np.argmax(ac[lags])])
+        phase = int(np.argmax([flux[p::lag].sum() for p in range(lag)]))
+        beats = np.arange(phase, len(flux), lag)
+        tempo = 60 * fps / lag
+    else:
+        beats, tempo = np.empty(0, np.int64), 0.0
+
+    meta = dict(rate=rate, hop=HOP, duration=len(samples) / rate, tempo=tempo)
+    return meta, dict(rms=rms.astype(np.float32), flux=flux.astype(np.float32),
+                      onsets=(onsets / fps).astype(np.float32),
+                      beats=(beats / fps).astype(np.float32))
+
+
+# ---------------- Cache ----------------
+def file_hash(path):
+    h = hashlib.sha1(f"v{VERSION}".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "index.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def build(dirs=TRACK_DIRS, cache_dir=CACHE_DIR):
+    """Analyse every *.wav in dirs whose content hash is not cached yet."""
+    os.makedirs(cache_dir, exist_ok=True)
+    index = _index(cache_dir)
+    for d in dirs:
+        for name in sorted(os.listdir(d)):
+            if not name.lower().endswith(".wav"):
+                continue
+            path = os.path.abspath(os.path.join(d, name))
+            st = os.stat(path)
+            digest = file_hash(path)
+            out = os.path.join(cache_dir, digest)
+            if not os.path.exists(os.path.join(out, "meta.json")):
+                meta, arrays = analyze(*read_wav(path))
+                tmp = out + ".tmp"
+                os.makedirs(tmp, exist_ok=True)
+                for k, a in arrays.items():
+                    np.save(os.path.join(tmp, k + ".npy"), a)
+                with open(os.path.join(tmp, "meta.json"), "w") as f:
+                    json.dump(meta, f)
+                os.replace(tmp, out)
+                print(f"{path}: {meta['tempo']:.0f} BPM, {len(arrays['onsets'])} onsets, "
+                      f"{len(arrays['beats'])} beats")
+            index[path] = dict(hash=digest, size=st.st_size, mtime_ns=st.st_mtime_ns)
+    tmp = os.path.join(cache_dir, "index.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(cache_dir, "index.json"))
+
+
+class Track:
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.__dict__.update(meta)
+        self.__dict__.update(arrays)
+        self.peak = float(self.rms.max()) or 1.0
+
+    def level(self, t):
+        """RMS at t relative to the track's loudest frame, 0..1."""
+        i = min(int(t * self.rate / self.hop), len(self.rms) - 1)
+        return float(self.rms[i] / self.peak)
+
+
+def load(dirs=TRACK_DIRS, cache_dir=CACHE_DIR):
+    """{file name: Track} for the analysed tracks in dirs (first dir wins); no decoding."""
+    index, tracks = _index(cache_dir), {}
+    for d in dict.fromkeys(os.path.abspath(d) for d in dirs):   # each directory once
+        if not os.path.isdir(d):
+            continue
+        for name in sorted(os.listdir(d)):
+            if not name.lower().endswith(".wav") or name in tracks:
+                continue
+            path = os.path.abspath(os.path.join(d, name))
+            entry, st = index.get(path), os.stat(path)
+            if not entry or (entry["size"], entry["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                print(f"Audio analysis missing for {path}; run audio_analysis.py")
+                continue
+            out = os.path.join(cache_dir, entry["hash"])
+            with open(os.path.join(out, "meta.json")) as f:
+                meta = json.load(f)
+            tracks[name] = Track(path, meta, {
+                k: np.load(os.path.join(out, k + ".npy"), mmap_mode="r") for k in ARRAYS})
+    return tracks
+
+
+# ---------------- Shows ----------------
+def light_show(track, length, tiles=0xFF, n=8):
+    """Timed (t, mask) frames: every beat flashes `tiles`, onsets between beats
+    light a chase of tiles sized by the loudness. Past the end of the track the
+    beat grid carries on at its tempo until `length`."""
+    period = 60 / track.tempo if track.tempo else 0.5
+    beats = [float(b) for b in track.beats if b < length]
+    t = (beats[-1] if beats else -period) + period
+    while t < length:
+        beats.append(t); t += period
+    pulses = [(b, b + min(0.2, period / 2), tiles) for b in beats]   # start, end, mask
+    bits = [i for i in range(n) if tiles >> i & 1]
+    k = 0
+    for o in track.onsets:
+        if o >= length or not bits:
+            break
+        if min((abs(o - b) for b in beats), default=1) < 0.06:
+            continue                            # already a beat flash
+        lit = max(1, math.ceil(track.level(o) * len(bits)))
+        pulses.append((float(o), float(o) + 0.1,
+                       sum(1 << bits[(k + j) % len(bits)] for j in range(lit))))
+        k += 1
+    # overlapping pulses OR together; emit a frame only where the mask changes
+    frames, last = [], 0
+    for t in sorted({p[0] for p in pulses} | {p[1] for p in pulses}):
+        if t >= length:
+            break
+        mask = 0
+        for start, end, m in pulses:
+            if start <= t < end: mask |= m
+        if mask != last:
+            frames.append((t, mask)); last = mask
+    return frames
+
+
+if __name__ == "__main__":
+    build(sys.argv[1:] or TRACK_DIRS)
@@ -0,0 +1,137 @@
+"""
+Button sources for the game loop. Both expose the same small interface:
+ – mask()            → int, bit i set while button i is pressed
+ – pressed_indices() → list of pressed button indices
+ – wait_change(t)    → block until the mask changes (or t seconds pass)
+ – wait_for(pred, t) → block until pred(mask()) holds; no polling, woken by edges
+ – wait_stable(q, t) → block until the mask has not changed for q seconds (or t pass)
+ – last_edge         → time.monotonic() of the latest edge, for latency figures
+ – on_edge(fn)       → also call fn() on every edge
+
+GpioButtons reads the Pi header pins through gpiozero edge callbacks.
+ArduinoButtons listens for the Mega's debounced B<hh..> frames (firmware SCAN mode);
+the Mega also lights the LED + pump itself for presses inside the uploaded target.
+MergedButtons stacks several sources (one per board) into one global mask.
+"""
+
+import threading, time
+
+
+class _Buttons:
+    local_feedback = False
+
+    def __init__(self):
+        self._cv = threading.Condition()
+        self._seq = 0                         # bumps on every edge
+        self.last_edge = None
+        self._listeners = []
+
+    def _edge(self):
+        with self._cv:
+            self.last_edge = time.monotonic()
+            self._seq += 1
+            self._cv.notify_all()
+        for fn in self._listeners:
+            fn()
+
+    def on_edge(self, fn):
+        self._listeners.append(fn)
+
+    def pressed_indices(self):
+        m = self.mask()
+        return [i for i in range(m.bit_length()) if m >> i & 1]
+
+    def wait_change(self, timeout=None):
+        with self._cv:
+            seq = self._seq
+            return self._cv.wait_for(lambda: self._seq != seq, timeout)
+
+    def wait_for(self, pred, timeout=None):
+        with self._cv:
+            return self._cv.wait_for(lambda: pred(self.mask()), timeout)
+
+    def wait_stable(self, quiet, timeout, debounce=0.03, on_settled=None):
+        """Mask once no edge has come for `quiet` s, or at `timeout` whatever it is.
+        on_settled(mask) is called when a new mask has lasted `debounce` s, so
+        bounces and half-steps never reach it. → (mask, seconds taken)."""
+        start = time.monotonic()
+        deadline = start + timeout
+        mask, since, shown = self.mask(), start, None
+        while True:
+            now = time.monotonic()
+            if mask != shown and now - since >= debounce:
+                shown = mask
+                if on_settled:
+                    on_settled(mask)
+            if now - since >= quiet or now >= deadline:
+                return mask, now - start
+            wake = since + (debounce if mask != shown else quiet)
+            if self.wait_change(min(wake, deadline) - now):
+                mask, since = self.mask(), time.monotonic()
+
+    def set_target(self, mask):
+        pass                                  # Pi drives the feedback itself
+
+
+class GpioButtons(_Buttons):
+    def __init__(self, pins):
+        super().__init__()
+        from gpiozero import Button
+        self.buttons = [Button(pin, pull_up=True) for pin in pins]
+        for b in self.buttons:
+            b.when_pressed = b.when_released = lambda *_: self._edge()
+
+    def mask(self):
+        m = 0
+        for i, b in enumerate(self.buttons):
+            if b.is_pressed: m |= 1 << i
+        return m
+
+
+class ArduinoButtons(_Buttons):
+    local_feedback = True
+
+    def __init__(self, link, send):
+        super().__init__()
+        self._send = send
+        self._mask = 0
+        link.on(b'B', self._on_frame)
+        send("SCAN 1")
+
+    def _on_frame(self, line):
+        try:
+            m = int(line[1:], 16)
+        except ValueError:
+            return
+        self._mask = m
+        self._edge()
+
+    def mask(self):
+        return self._mask
+
+    def set_target(self, mask):
+        """Upload the current step's targets; 0 disables local feedback."""
+        self._send(f"TARGET {mask}")
+
+
+class MergedButtons(_Buttons):
+    """parts = [(source, width), ...]; part k's bit i is global bit sum(widths[:k]) + i."""
+
+    def __init__(self, parts):
+        super().__init__()
+        self.parts, shift = [], 0
+        for source, width in parts:
+            self.parts.append((source, shift, (1 << width) - 1))
+            source.on_edge(self._edge)
+            shift += width
+        self.local_feedback = all(p[0].local_feedback for p in self.parts)
+
+    def mask(self):
+        m = 0
+        for source, shift, _ in self.parts:
+            m |= source.mask() << shift
+        return m
+
+    def set_target(self, mask):
+        for source, shift, full in self.parts:
+            source.set_target(mask >> shift & full)
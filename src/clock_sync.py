@@ -0,0 +1,96 @@
+"""
+Pi ↔ Mega clock sync and time-tagged bank commands:
+ – sync() fires a burst of SYNC probes and keeps the lowest-RTT T reply
+ – every burst adds one (pi_us, mega_us) point; a line through the points
+   gives offset and skew, so the Mega's ceramic resonator drift is tracked
+ – micros() wraps every ~71.6 min and syncs only happen in water_state, so
+   a long idle spell can hide several wraps: the whole wraps between two points
+   are counted from the Pi's own elapsed time, not from raw < last raw
+ – at(t, bank, mask) sends AT <mega_us> …; the Mega runs it from micros()
+   (bank ids: protocols.GAME / WAIT / PUMP)
+"""
+
+import threading, time
+
+BAUD = 9600
+MAX_POINTS = 8                         # sync bursts kept for the skew fit
+
+
+def now_us():
+    return time.monotonic_ns() // 1000
+
+
+class ClockSync:
+    def __init__(self, link, send):
+        self._link = link
+        self._send = send
+        self._resets = link.stats['resets']
+        self._reply = None
+        self._got = threading.Event()
+        self.points = []               # (pi_us, mega_us), mega_us unwrapped
+        self.offset, self.skew = None, 1.0
+        self.rtt_us = None
+        link.on(b'T ', self._on_frame)
+
+    def _on_frame(self, line):
+        self._reply = (now_us(), int(line[2:]), len(line) + 2)
+        self._got.set()
+
+    # ---------------- Sync ----------------
+    def sync(self, rounds=8, timeout=0.2):
+        """One probe burst; returns True once a usable mapping exists."""
+        if self._link.stats['resets'] != self._resets:   # Mega rebooted: old points are void
+            self._resets = self._link.stats['resets']
+            self.points, self.offset, self.skew = [], None, 1.0
+        cmd_us = 5 * 10 * 1_000_000 // BAUD          # "SYNC\n" on the wire
+        best = None
+        for _ in range(rounds):
+            self._got.clear()
+            t0 = now_us()
+            self._send("SYNC")
+            if not self._got.wait(timeout):
+                continue
+            t1, raw, nbytes = self._reply
+            reply_us = nbytes * 10 * 1_000_000 // BAUD
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                # symmetric USB latency assumed; wire times are not symmetric
+                best = (rtt, t0 + (rtt + cmd_us - reply_us) // 2, raw)
+        if best is None:
+            return self.offset is not None
+        rtt, pi_us, raw = best
+        self.rtt_us = rtt
+        self.points = (self.points + [(pi_us, self._unwrap(pi_us, raw))])[-MAX_POINTS:]
+        self._fit()
+        return True
+
+    def _unwrap(self, pi_us, raw):
+        """raw micros() → continuous Mega µs, using the Pi time since the last point."""
+        if not self.points:
+            return raw
+        last_pi, last_mega = self.points[-1]
+        step = (raw - last_mega) & 0xFFFFFFFF          # advance modulo one wrap
+        step += round((pi_us - last_pi - step) / (1 << 32)) << 32   # plus the wraps it hid
+        return last_mega + step
+
+    def _fit(self):
+        pts = self.points
+        if len(pts) >= 2 and pts[-1][0] - pts[0][0] > 1_000_000:
+            n = len(pts)
+            mx = sum(p for p, _ in pts) / n
+            my = sum(m for _, m in pts) / n
+            sxx = sum((p - mx) ** 2 for p, _ in pts)
+            self.skew = sum((p - mx) * (m - my) for p, m in pts) / sxx
+        p, m = pts[-1]                 # anchor at the newest point: we extrapolate forward
+        self.offset = m - self.skew * p
+
+    # ---------------- Scheduling ----------------
+    def to_mega(self, t):
+        """Pi monotonic time (s) → Mega micros() value (32-bit)."""
+        return int(self.offset + self.skew * t * 1_000_000) & 0xFFFFFFFF
+
+    def at(self, t, bank, mask):
+        self._send(f"AT {self.to_mega(t)} {bank} {mask}")
+
+    def cancel(self):
+        self._send("CANCEL")
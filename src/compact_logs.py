@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Columnar archive of the session store (logs/ next to sessions.db):
+ – compact() moves settled sessions and raw press events out of SQLite into a
+   new chunk directory of typed .npy columns (one file per column), written to
+   a temp dir and renamed into place, then recorded in logs/index.json
+ – the watermark is the last archived session id: a chunk holds settled sessions
+   and all of their events, and --prune deletes only events of sessions at or
+   below it (event rowids restart once the table is empty, so they cannot be one)
+ – readers np.load every column with mmap_mode='r' and concatenate, so a
+   report over months touches only the columns it needs, never parses rows
+ – reaction_histograms() / wrong_heatmap() are whole-array NumPy operations
+
+CLI:
+  python3 compact_logs.py compact [--prune]    # --prune deletes archived events from SQLite
+  python3 compact_logs.py report [--days 90]
+"""
+
+import argparse, datetime, json, os, time
+import numpy as np
+
+import session_store
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+SETTLE_S = 3600                 # sessions younger than this may still be running
+FLOOR_COLS = 4                  # heatmap layout: button i at divmod(i, 4), rows as needed
+MIN_TILES = 8                   # the smallest floor; bigger ones show up in the data
+
+EVENT_COLS = {                  # column → dtype
+    "session": np.int64, "day": np.int32, "players": np.int8, "attempt": np.int16,
+    "step": np.int8, "t": np.float32, "button": np.int8, "correct": np.bool_,
+}
+SESSION_COLS = {
+    "id": np.int64, "day": np.int32, "players": np.int8, "attempts": np.int16,
+    "won": np.bool_, "duration": np.float32,
+}
+
+
+def day_number(iso):
+    return datetime.date.fromisoformat(iso).toordinal()
+
+
+def read_index(log_dir=LOG_DIR):
+    try:
+        with open(os.path.join(log_dir, "index.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict(session_id=0, chunks=[])
+
+
+def write_index(index, log_dir=LOG_DIR):
+    tmp = os.path.join(log_dir, "index.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(log_dir, "index.json"))
+
+
+# ---------------- Compaction ----------------
+def compact(db_path=session_store.DB_PATH, log_dir=LOG_DIR, prune=False):
+    """Archive everything settled since the last run; returns the new chunk entry or None."""
+    os.makedirs(log_dir, exist_ok=True)
+    index = read_index(log_dir)
+    db = session_store.connect(db_path)
+    cutoff = int((time.time() - SETTLE_S) * 1000)
+
+    sessions = db.execute("""
+        SELECT id, day, players, coalesce(attempts, 1), coalesce(won, 0),
+               coalesce(ended - started, 0)
+        FROM sessions WHERE id > ? AND id < ? ORDER BY id""",
+        (index["session_id"], cutoff)).fetchall()
+    if not sessions:
+        return None
+    last = sessions[-1][0]
+    events = db.execute("""
+        SELECT e.session, s.day, s.players, e.attempt, e.step, e.t, e.button, e.correct
+        FROM events e JOIN sessions s ON s.id = e.session
+        WHERE e.session > ? AND e.session <= ? ORDER BY e.session, e.rowid""",
+        (index["session_id"], last)).fetchall()
+
+    cols = {}
+    ids, days, *rest = zip(*sessions)
+    for (name, dt), data in zip(SESSION_COLS.items(),
+                                [ids, [day_number(d) for d in days], *rest]):
+        cols["sessions_" + name] = np.array(data, dtype=dt)
+    if events:
+        sids, days, *rest = zip(*events)
+        for (name, dt), data in zip(EVENT_COLS.items(),
+                                    [sids, [day_number(d) for d in days], *rest]):
+            cols["events_" + name] = np.array(data, dtype=dt)
+
+    name = f"chunk_{len(index['chunks']):05d}"
+    tmp = os.path.join(log_dir, name + ".tmp")
+    os.makedirs(tmp, exist_ok=True)
+    for col, arr in cols.items():
+        np.save(os.path.join(tmp, col + ".npy"), arr)
+    os.rename(tmp, os.path.join(log_dir, name))
+
+    all_days = np.concatenate([cols[c] for c in ("sessions_day", "events_day") if c in cols])
+    entry = dict(name=name, sessions=len(sessions), events=len(events),
+                 day_min=int(all_days.min()), day_max=int(all_days.max()))
+    index["chunks"].append(entry)
+    index["session_id"] = int(last)
+    write_index(index, log_dir)
+
+    if prune:
+        with db:
+            db.execute("DELETE FROM events WHERE session <= ?", (index["session_id"],))
+    return entry
+
+
+# ---------------- Readers ----------------
+def load(table, columns, days=None, log_dir=LOG_DIR):
+    """{column: array} over every chunk (optionally only the last `days` days)."""
+    since = datetime.date.today().toordinal() - days + 1 if days else None
+    parts = {c: [] for c in columns}
+    for chunk in read_index(log_dir)["chunks"]:
+        if since and chunk["day_max"] < since:
+            continue
+        path = os.path.join(log_dir, chunk["name"])
+        if not os.path.exists(os.path.join(path, f"{table}_day.npy")):
+            continue
+        day = np.load(os.path.join(path, f"{table}_day.npy"), mmap_mode="r")
+        keep = slice(None) if not since or chunk["day_min"] >= since else day >= since
+        for c in columns:
+            parts[c].append(np.load(os.path.join(path, f"{table}_{c}.npy"), mmap_mode="r")[keep])
+    dtypes = EVENT_COLS if table == "events" else SESSION_COLS
+    return {c: np.concatenate(p) if p else np.empty(0, dtypes[c]) for c, p in parts.items()}
+
+
+def tile_count(ev):
+    """Tiles the logged floor has: highest pressed index + 1, at least MIN_TILES."""
+    return max(MIN_TILES, int(ev["button"].max()) + 1 if len(ev["button"]) else 0)
+
+
+def reaction_histograms(ev, bins=np.arange(0, 10.5, 0.5), buttons=None):
+    """Counts of correct presses per (button, seconds-since-step-start bin)."""
+    buttons = buttons or tile_count(ev)
+    ok = ev["correct"]
+    counts, _, _ = np.histogram2d(ev["button"][ok], ev["t"][ok],
+                                  bins=[np.arange(buttons + 1), bins])
+    return counts.astype(np.int64), bins
+
+
+def wrong_heatmap(ev, cols=FLOOR_COLS):
+    """(wrong presses, wrong-press rate) per tile, shaped like the floor."""
+    layout = (-(-tile_count(ev) // cols), cols)
+    n = layout[0] * layout[1]
+    wrong = np.bincount(ev["button"][~ev["correct"]], minlength=n)[:n]
+    total = np.bincount(ev["button"], minlength=n)[:n]
+    rate = np.divide(wrong, total, out=np.zeros(n), where=total > 0)
+    return wrong.reshape(layout), rate.reshape(layout)
+
+
+def report(days=90, log_dir=LOG_DIR):
+    ev = load("events", ("button", "t", "correct"), days, log_dir)
+    print(f"{len(ev['button'])} press events over the last {days} days")
+    counts, bins = reaction_histograms(ev)
+    med = [np.median(ev["t"][ev["correct"] & (ev["button"] == b)]) if counts[b].any() else 0
+           for b in range(len(counts))]
+    print("Reaction time (s since step start), correct presses:")
+    print("button " + "".join(f"{b:>5g}" for b in bins[:-1]) + "   median")
+    for b, row in enumerate(counts):
+        print(f"{b + 1:>6} " + "".join(f"{c:>5}" for c in row) + f"   {med[b]:6.2f}")
+    wrong, rate = wrong_heatmap(ev)
+    print("Wrong presses per tile (count / share of that tile's presses):")
+    for r in range(wrong.shape[0]):
+        print("  " + "  ".join(f"{w:>6} {p:5.1%}" for w, p in zip(wrong[r], rate[r])))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Archive and analyse session logs")
+    ap.add_argument("--db", default=session_store.DB_PATH)
+    ap.add_argument("--logs", default=LOG_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("compact").add_argument("--prune", action="store_true")
+    sub.add_parser("report").add_argument("--days", type=int, default=90)
+    args = ap.parse_args(argv)
+    if args.cmd == "compact":
+        entry = compact(args.db, args.logs, args.prune)
+        print("Nothing to compact" if entry is None else f"Wrote {entry}")
+    else:
+        t = time.perf_counter()
+        report(args.days, args.logs)
+        print(f"({time.perf_counter() - t:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Opens the output side: Mega serial link, protocol driver and the optional
+PCA9685 for game LEDs. Shared by Final_RaspberryPi.py and by the output
+process of pipeline.py. open_boards() does the same for several Megas and
+joins them into one floor (shards.py).
+"""
+
+import serial
+from serial_link import SerialLink, RX_WINDOW
+from protocols import Driver, detect, GAME
+from shards import ShardedOutputs
+
+SERIAL_PORT = '/dev/ttyUSB0'
+
+
+def open_outputs(port=SERIAL_PORT, led_backend="arduino", pca_channels=()):
+    """Return (link, proto, out); out.game_led/game_leds go to the PCA9685 if asked."""
+    ser = serial.Serial(port, 9600, timeout=1)
+    link = SerialLink(ser, window=None)  # no credits until we know the firmware acks
+    proto = detect(link)                 # Arduino resets when the port opens
+    if proto.acked: link.window = RX_WINDOW
+    print("Arduino protocol:", proto.name)
+
+    out = Driver(proto, link)
+    if led_backend == "pca9685":
+        from pca9685_out import PCA9685Leds
+        leds = PCA9685Leds.from_board(pca_channels)
+        out.game_led, out.game_leds = leds.game_led, leds.game_leds
+    return link, proto, out
+
+
+def open_boards(ports=(SERIAL_PORT,), led_backend="arduino", pca_channels=()):
+    """Return (links, proto, out) for boards in floor order; the PCA9685 (if any)
+    replaces the first board's game LEDs. out.n is the number of tiles."""
+    boards = [open_outputs(port, led_backend if k == 0 else "arduino", pca_channels)
+              for k, port in enumerate(ports)]
+    links, protos, outs = zip(*boards)
+    if len({p.name for p in protos}) > 1:
+        print("Boards run different firmwares:", [p.name for p in protos])
+    proto = min(protos, key=lambda p: (p.acked, p.timed, p.scan, p.attract))
+    widths = [len(pca_channels) if k == 0 and led_backend == "pca9685" else p.sizes[GAME]
+              for k, p in enumerate(protos)]
+    if len(outs) == 1:
+        outs[0].n = widths[0]
+        return list(links), proto, outs[0]
+    return list(links), proto, ShardedOutputs(outs, widths)
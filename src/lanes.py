@@ -0,0 +1,97 @@
+"""
+Lane partitioning (LANES in Final_RaspberryPi.py): the floor is cut into equal
+blocks of consecutive tiles, each running its own game on lane-local indices.
+ – Floor keeps the one true mask per bank; every lane write is merged into it
+   under a lock and the whole bank goes out as one mask write, so lanes never
+   switch off each other's LEDs or pumps
+ – LaneButtons sees only its own bits and only wakes on edges inside its lane;
+   TARGET uploads are merged the same way, but the Pi drives all feedback
+   (local_feedback = False) so the merged frame stays the truth
+ – the four wait LEDs are shared out evenly between the lanes
+"""
+
+import threading
+
+from button_input import _Buttons
+from protocols import GAME, WAIT, PUMP
+
+WAIT_LEDS = 4
+
+
+class Floor:
+    def __init__(self, out, buttons, lanes):
+        self.out, self.buttons = out, buttons
+        self.width = out.n // lanes
+        self.wait_width = WAIT_LEDS // lanes
+        self._lock = threading.Lock()
+        self._state = {GAME: 0, WAIT: 0, PUMP: 0}
+        self._write = {GAME: out.game_leds, WAIT: out.wait_leds, PUMP: out.pumps}
+        self._targets = [0] * lanes
+        self.lanes = [(LaneButtons(self, k), LaneOutputs(self, k)) for k in range(lanes)]
+
+    def write(self, bank, shift, width, mask):
+        full = ((1 << width) - 1) << shift
+        with self._lock:
+            new = self._state[bank] & ~full | (mask << shift) & full
+            if new != self._state[bank]:
+                self._write[bank](new)
+                self._state[bank] = new
+
+    def set_target(self, lane, mask):
+        with self._lock:
+            self._targets[lane] = mask
+            self.buttons.set_target(sum(t << k * self.width for k, t in enumerate(self._targets)))
+
+
+class LaneButtons(_Buttons):
+    local_feedback = False
+
+    def __init__(self, floor, k):
+        super().__init__()
+        self.floor, self.lane = floor, k
+        self.shift, self.full = k * floor.width, (1 << floor.width) - 1
+        self._last = self.mask()
+        floor.buttons.on_edge(self._on_floor_edge)
+
+    def _on_floor_edge(self):
+        m = self.mask()
+        if m != self._last:
+            self._last = m
+            self._edge()
+
+    def mask(self):
+        return self.floor.buttons.mask() >> self.shift & self.full
+
+    def set_target(self, mask):
+        self.floor.set_target(self.lane, mask)
+
+
+class LaneOutputs:
+    """The calls of protocols.Driver on lane-local indices (no native attract)."""
+
+    def __init__(self, floor, k):
+        self.floor = floor
+        self.n = floor.width
+        self._game = self._pump = self._wait = 0
+        self.shift, self.wait_shift = k * floor.width, k * floor.wait_width
+
+    def game_leds(self, mask):
+        self._game = mask
+        self.floor.write(GAME, self.shift, self.n, mask)
+
+    def pumps(self, mask):
+        self._pump = mask
+        self.floor.write(PUMP, self.shift, self.n, mask)
+
+    def wait_leds(self, mask):
+        self._wait = mask
+        self.floor.write(WAIT, self.wait_shift, self.floor.wait_width, mask)
+
+    def game_led(self, idx, on):
+        self.game_leds(self._game | 1 << idx if on else self._game & ~(1 << idx))
+
+    def pump(self, idx, on):
+        self.pumps(self._pump | 1 << idx if on else self._pump & ~(1 << idx))
+
+    def wait_led(self, idx, on):
+        self.wait_leds(self._wait | 1 << idx if on else self._wait & ~(1 << idx))
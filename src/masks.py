@@ -0,0 +1,20 @@
+"""
+Tile sets as int bit masks (bit i = tile i), shared by the game loop and the
+host benchmarks: the per-tick work is a few big-int operations plus one step
+per set bit, however many tiles the floor has.
+"""
+
+
+def bits(mask):
+    """Indices of the set bits, lowest first; O(set bits), not O(N)."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def tick(targets, pressed, hit, seen):
+    """One play_state wake → (indices pressed since `seen`, wrong presses, new hits)."""
+    return bits(pressed & ~seen), pressed & ~targets, pressed & targets & ~hit
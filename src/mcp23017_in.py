@@ -0,0 +1,206 @@
+"""
+Buttons on MCP23017 I/O expanders (16 inputs each, I2C addresses 0x20-0x27):
+ – every expander is set up with pull-ups, inverted polarity (pressed = 1) and
+   interrupt-on-change on all 16 pins; INTA/INTB are mirrored and open-drain,
+   so any number of expanders can share one Pi GPIO as their INT line
+ – an INT falling edge (gpiozero callback) triggers ONE combined I2C transaction
+   per expander on that line: register pointer GPIOA, repeated start, 2 bytes
+   (GPIOA + GPIOB); reading GPIO also clears the interrupt
+ – nothing is read while no one presses anything; poll() exists only for the
+   bus-utilization comparison in Test/Bench_MCP23017.py
+ – expander k's pin i is global button 16 * k + i, in the order given
+SimI2C / SimMCP23017 / SimIntLine model the bus, the chip's registers and the
+INT wiring closely enough to run the backend without hardware.
+"""
+
+import threading, time
+
+from button_input import _Buttons
+
+IODIRA, IPOLA, GPINTENA, INTCONA, IOCON = 0x00, 0x02, 0x04, 0x08, 0x0A
+GPPUA, INTFA, INTCAPA, GPIOA = 0x0C, 0x0E, 0x10, 0x12
+MIRROR, ODR = 0x40, 0x04                       # IOCON bits (BANK = 0, SEQOP = 0)
+I2C_HZ = 100_000
+
+
+def bus_bits(*byte_counts):
+    """Bits on the wire for one transaction made of segments (START/RESTART + bytes
+    incl. address, each 8 bits + ACK) and a final STOP."""
+    return sum(1 + 9 * n for n in byte_counts) + 1
+
+
+class MCP23017Buttons(_Buttons):
+    def __init__(self, i2c, expanders):
+        """expanders: [(address, int_line), ...]; int_line is a BCM pin number or an
+        object with when_pressed / is_pressed (e.g. SimIntLine)."""
+        super().__init__()
+        self.i2c = i2c
+        self.addresses = [a for a, _ in expanders]
+        self._ports = [0] * len(expanders)          # last 16-bit reading per expander
+        self._lock = threading.Lock()
+        self.transactions = self.bits = 0
+        for a in self.addresses:
+            self._setup(a)
+        lines = {}
+        for k, (_, line) in enumerate(expanders):
+            lines.setdefault(line, []).append(k)
+        self._lines = []
+        for line, ks in lines.items():
+            if isinstance(line, int):
+                from gpiozero import Button
+                line = Button(line, pull_up=True)   # INT is active-low open-drain
+            line.when_pressed = lambda *_, line=line, ks=ks: self._on_int(line, ks)
+            self._lines.append(line)
+        for k in range(len(self.addresses)):        # pick up tiles already held down
+            self._read(k)
+
+    @classmethod
+    def from_board(cls, expanders):
+        import board, busio
+        return cls(busio.I2C(board.SCL, board.SDA, frequency=I2C_HZ), expanders)
+
+    # ---------------- I2C ----------------
+    def _locked(self, fn, *args):
+        while not self.i2c.try_lock():
+            pass
+        try:
+            fn(*args)
+        finally:
+            self.i2c.unlock()
+
+    def _setup(self, address):
+        for reg, a, b in ((IOCON, MIRROR | ODR, MIRROR | ODR),
+                          (IODIRA, 0xFF, 0xFF), (GPPUA, 0xFF, 0xFF), (IPOLA, 0xFF, 0xFF),
+                          (INTCONA, 0, 0), (GPINTENA, 0xFF, 0xFF)):
+            self._locked(self.i2c.writeto, address, bytes([reg, a, b]))
+            self.transactions += 1
+            self.bits += bus_bits(4)
+
+    def _read(self, k):
+        """One burst: both ports of expander k; returns True if they changed."""
+        buf = bytearray(2)
+        self._locked(self.i2c.writeto_then_readfrom, self.addresses[k], bytes([GPIOA]), buf)
+        self.transactions += 1
+        self.bits += bus_bits(2, 3)
+        value = buf[0] | buf[1] << 8
+        if value == self._ports[k]:
+            return False
+        self._ports[k] = value
+        return True
+
+    # ---------------- Interrupt path ----------------
+    def _on_int(self, line, ks):
+        with self._lock:
+            while True:
+                changed = False
+                for k in ks:
+                    changed |= self._read(k)
+                if changed:
+                    self._edge()
+                if not line.is_pressed:     # released INT: nothing pending
+                    break                   # still low: a change raced the read, go again
+
+    def mask(self):
+        m = 0
+        for k, port in enumerate(self._ports):
+            m |= port << 16 * k
+        return m
+
+    # ---------------- Polling (comparison only) ----------------
+    def poll(self, period, stop):
+        """Read every expander each period until stop (an Event) is set."""
+        t = time.monotonic()
+        while not stop.is_set():
+            with self._lock:
+                if any([self._read(k) for k in range(len(self.addresses))]):
+                    self._edge()
+            t += period
+            time.sleep(max(0, t - time.monotonic()))
+
+    def bus_time(self):
+        """Seconds of bus occupancy so far at I2C_HZ."""
+        return self.bits / I2C_HZ
+
+
+# ---------------- Simulation ----------------
+class SimIntLine:
+    """Open-drain INT wire shared by any number of simulated expanders."""
+
+    def __init__(self):
+        self.when_pressed = None
+        self._low = set()
+
+    @property
+    def is_pressed(self):
+        return bool(self._low)
+
+    def pull(self, chip, low):
+        was = self.is_pressed
+        (self._low.add if low else self._low.discard)(chip)
+        if low and not was and self.when_pressed:
+            self.when_pressed()
+
+
+class SimMCP23017:
+    """Register file of one chip in BANK = 0, interrupt-on-change against the value
+    seen by the last GPIO read."""
+
+    def __init__(self, line=None):
+        self.regs = bytearray(0x16)
+        self.regs[IODIRA] = self.regs[IODIRA + 1] = 0xFF
+        self.line = line
+        self.pins = 0xFFFF                      # pulled up: nothing pressed
+        self._seen = self._gpio()
+        self._int = False
+
+    def _reg16(self, reg):
+        return self.regs[reg] | self.regs[reg + 1] << 8
+
+    def _gpio(self):
+        return (self.pins ^ self._reg16(IPOLA)) & 0xFFFF
+
+    def write(self, data):
+        reg = data[0]
+        for k, b in enumerate(data[1:]):
+            self.regs[reg + k] = b
+
+    def read(self, reg, n):
+        gpio = self._gpio()
+        out = bytes(gpio >> 8 * (r - GPIOA) & 0xFF if r in (GPIOA, GPIOA + 1)
+                    else self.regs[r] for r in range(reg, reg + n))
+        if reg <= GPIOA + 1 and reg + n > GPIOA:
+            self._seen = gpio                   # reading GPIO clears the interrupt
+            self._set_int(False)
+        return out
+
+    def press(self, pin, down=True):
+        self.pins = self.pins & ~(1 << pin) if down else self.pins | 1 << pin
+        gpio = self._gpio()
+        changed = (gpio ^ self._seen) & self._reg16(GPINTENA)
+        if changed and not self._int:
+            self.regs[INTFA], self.regs[INTFA + 1] = changed & 0xFF, changed >> 8
+            self.regs[INTCAPA], self.regs[INTCAPA + 1] = gpio & 0xFF, gpio >> 8
+            self._set_int(True)
+
+    def _set_int(self, on):
+        self._int = on
+        if self.line:
+            self.line.pull(self, on)
+
+
+class SimI2C:
+    def __init__(self, devices):
+        self.devices = devices                  # address → SimMCP23017
+        self._lock = threading.Lock()
+
+    def try_lock(self):
+        return self._lock.acquire(blocking=False)
+
+    def unlock(self):
+        self._lock.release()
+
+    def writeto(self, address, buf):
+        self.devices[address].write(bytes(buf))
+
+    def writeto_then_readfrom(self, address, out, in_buf):
+        in_buf[:] = self.devices[address].read(out[0], len(in_buf))
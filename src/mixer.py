@@ -0,0 +1,104 @@
+"""
+Voice management on top of pygame.mixer, so sounds overlap instead of cutting
+each other off:
+ – the music stream carries only the background bed (rmb.wav), looped and never
+   reloaded; everything else is a Sound on one of VOICES channels
+ – every voice has a kind: "stage" (stage tracks, success chime), "press" (tile
+   tones), "error"; a key (a lane number) makes a voice replace the one before
+   it with the same key, so a lane's stage tracks still follow on from each other
+ – no free channel: the lowest-priority, oldest voice that is not above the
+   new one is stolen; if every voice outranks it the new sound is dropped
+ – while stage or error voices play the music is ducked to DUCK[kind] and
+   ramped back after the last one ends; a thread sleeps until that moment
+ – stats counts plays, steals and drops; Test/Bench_Mixer.py measures CPU per
+   active voice
+"""
+
+import threading, time
+
+VOICES = 12
+PRIORITY = {"press": 1, "stage": 2, "error": 3}
+DUCK = {"stage": 0.35, "error": 0.5}   # music volume while such a voice plays
+MUSIC_VOLUME = 0.6
+RAMP_S = 0.3                           # un-duck over this long
+
+
+class Mixer:
+    def __init__(self, voices=VOICES):
+        import pygame
+        self.pg = pygame
+        pygame.mixer.set_num_channels(voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+        self.voices = [None] * voices          # (kind, key, started, ends) per channel
+        self.stats = dict(plays=0, steals=0, drops=0)
+        self._cv = threading.Condition()
+        self._music = None
+        threading.Thread(target=self._ducker, daemon=True).start()
+
+    # ---------------- Background music ----------------
+    def music(self, path):
+        """Loop path on the music stream; the same path again is a no-op."""
+        if path == self._music:
+            return
+        self.pg.mixer.music.load(path)
+        self.pg.mixer.music.set_volume(MUSIC_VOLUME * self._duck_level(time.monotonic()))
+        self.pg.mixer.music.play(-1)
+        self._music = path
+
+    # ---------------- Voices ----------------
+    def play(self, sound, kind, key=None):
+        """Start sound as a voice of this kind; → channel index, or None if dropped."""
+        now = time.monotonic()
+        with self._cv:
+            k = self._pick(kind, key, now)
+            if k is None:
+                self.stats['drops'] += 1
+                return None
+            self.channels[k].play(sound)
+            self.voices[k] = (kind, key, now, now + sound.get_length())
+            self.stats['plays'] += 1
+            self._cv.notify()                  # the ducking level may have changed
+        return k
+
+    def _pick(self, kind, key, now):
+        live = [(k, v) for k, v in enumerate(self.voices)
+                if v is not None and v[3] > now and self.channels[k].get_busy()]
+        if key is not None:
+            for k, v in live:
+                if v[1] == key:
+                    return k
+        busy = {k for k, _ in live}
+        for k in range(len(self.channels)):
+            if k not in busy:
+                return k
+        prio = PRIORITY[kind]
+        victims = [(PRIORITY[v[0]], v[2], k) for k, v in live if PRIORITY[v[0]] <= prio]
+        if not victims:
+            return None
+        self.stats['steals'] += 1
+        return min(victims)[2]
+
+    def active(self):
+        now = time.monotonic()
+        return sum(1 for v in self.voices if v is not None and v[3] > now)
+
+    # ---------------- Ducking ----------------
+    def _duck_level(self, now):
+        return min([DUCK[v[0]] for v in self.voices
+                    if v is not None and v[0] in DUCK and v[3] > now], default=1.0)
+
+    def _ducker(self):
+        with self._cv:
+            while True:
+                now = time.monotonic()
+                level = self._duck_level(now)
+                ends = [v[3] for v in self.voices if v is not None and v[0] in DUCK and v[3] > now]
+                current = self.pg.mixer.music.get_volume() / MUSIC_VOLUME
+                if level < current - 0.01:              # duck at once
+                    self.pg.mixer.music.set_volume(MUSIC_VOLUME * level)
+                elif level > current + 0.01:            # ramp back up in small steps
+                    step = (1.0 - min(DUCK.values())) * 0.05 / RAMP_S
+                    self.pg.mixer.music.set_volume(MUSIC_VOLUME * min(level, current + step))
+                    self._cv.wait(0.05)
+                    continue
+                self._cv.wait(min(ends) - now if ends else None)
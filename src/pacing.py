@@ -0,0 +1,68 @@
+"""
+Queue-aware pacing: how long the fixed parts of a session last, scaled between
+RELAXED (the original timings) and BUSY by a busy level 0..1 taken as the
+strongest of these signals:
+ – a manual switch on a GPIO pin (closed = busy)
+ – tiles already held when a session ends, i.e. the next group stepping on
+ – the idle gap between sessions: every gap ≤ GAP_BUSY s is busy, ≥ GAP_IDLE s idle
+The level is smoothed (EWMA) so one odd session does not swing the timings.
+Every finished session is logged with its level; `session_store.py pacing`
+shows the resulting throughput per level.
+"""
+
+import threading, time
+from collections import deque
+
+RELAXED = dict(waiting=2.0, demo_on=1.0, demo_step=1.7, gap=0.5, win=10.0)
+BUSY    = dict(waiting=1.0, demo_on=0.6, demo_step=1.0, gap=0.3, win=4.0)
+GAP_BUSY, GAP_IDLE = 5.0, 60.0         # s between sessions
+QUEUE_FULL = 3                         # tiles held at session end that count as fully busy
+SMOOTHING = 0.5                        # weight of the newest reading
+
+
+class Pacer:
+    def __init__(self, switch_pin=None, relaxed=RELAXED, busy=BUSY):
+        self.relaxed, self.busy = relaxed, busy
+        self.switch = None
+        if switch_pin is not None:
+            from gpiozero import Button
+            self.switch = Button(switch_pin, pull_up=True)
+        self.level = 0.0
+        self._gap = self._queue = 0.0
+        self._lock = threading.Lock()
+        self._done = deque()                   # (end time, players) over the last hour
+
+    # ---------------- Signals ----------------
+    def note_gap(self, seconds):
+        """Idle time before the latest session started."""
+        self._update('_gap', (GAP_IDLE - seconds) / (GAP_IDLE - GAP_BUSY))
+
+    def note_queue(self, tiles_held):
+        """Tiles pressed at the end of a session by people who are not playing."""
+        self._update('_queue', tiles_held / QUEUE_FULL)
+
+    def _update(self, name, reading):
+        with self._lock:
+            setattr(self, name, min(1.0, max(0.0, reading)))
+            target = max(self._gap, self._queue)
+            self.level += SMOOTHING * (target - self.level)
+
+    def current(self):
+        if self.switch is not None and self.switch.is_pressed:
+            return 1.0
+        return self.level
+
+    def timing(self):
+        """Durations for the next session at the current busy level."""
+        x = self.current()
+        return {k: self.relaxed[k] + (self.busy[k] - self.relaxed[k]) * x for k in self.relaxed}
+
+    # ---------------- Throughput ----------------
+    def session_done(self, players):
+        now = time.monotonic()
+        with self._lock:
+            self._done.append((now, players))
+            while self._done[0][0] < now - 3600:
+                self._done.popleft()
+            n, p = len(self._done), sum(q for _, q in self._done)
+        return f"pace {self.current():.2f}: last hour {n} sessions, {p} players"
@@ -0,0 +1,102 @@
+"""
+PCA9685 game-LED backend (the board from Test/IfLEDWorks_Circle.py):
+ – keeps the whole 16-channel frame of 12-bit duties in memory
+ – show(frame) writes only the span of channels that changed, as ONE
+   auto-increment block write starting at that channel's LEDn_ON_L register
+ – fades are computed as complete frames, so every tick is one I2C transaction
+   instead of one duty_cycle assignment (one transaction) per channel
+"""
+
+import time
+
+MODE1, PRESCALE, LED0_ON_L = 0x00, 0xFE, 0x06
+SLEEP, AI, RESTART = 0x10, 0x20, 0x80
+FULL = 4095
+OSC_HZ = 25_000_000
+
+
+def duty_regs(duty):
+    """12-bit duty → ON_L, ON_H, OFF_L, OFF_H (using the full-on / full-off bits)."""
+    if duty >= FULL: return (0, 0x10, 0, 0)
+    if duty <= 0:    return (0, 0, 0, 0x10)
+    return (0, 0, duty & 0xFF, duty >> 8)
+
+
+class PCA9685Leds:
+    def __init__(self, i2c, channels, address=0x40, freq=1000):
+        self.i2c = i2c
+        self.address = address
+        self.channels = list(channels)          # game LED index → PCA channel
+        self.frame = [0] * 16                   # last duties written
+        self.transactions = 0
+        self.bytes = 0
+        ps = round(OSC_HZ / (4096 * freq)) - 1
+        self._write(bytes([MODE1, SLEEP | AI]))
+        self._write(bytes([PRESCALE, ps]))
+        self._write(bytes([MODE1, AI]))
+        time.sleep(0.0005)                      # oscillator start-up
+        self._write(bytes([MODE1, RESTART | AI]))
+        self.show([0] * 16, force=True)
+
+    @classmethod
+    def from_board(cls, channels, **kw):
+        import board, busio
+        return cls(busio.I2C(board.SCL, board.SDA), channels, **kw)
+
+    def _write(self, buf):
+        while not self.i2c.try_lock():
+            pass
+        try:
+            self.i2c.writeto(self.address, buf)
+        finally:
+            self.i2c.unlock()
+        self.transactions += 1
+        self.bytes += len(buf) + 1              # + address byte
+
+    # ---------------- Frames ----------------
+    def show(self, frame, force=False):
+        """Write a 16-channel duty frame; one block write covers every change."""
+        changed = [ch for ch in range(16) if force or frame[ch] != self.frame[ch]]
+        if not changed:
+            return
+        lo, hi = changed[0], changed[-1]
+        buf = bytearray([LED0_ON_L + 4 * lo])
+        for ch in range(lo, hi + 1):
+            buf += bytes(duty_regs(frame[ch]))
+        self._write(bytes(buf))
+        self.frame = list(frame)
+
+    def levels_frame(self, levels):
+        """Per-game-LED duties → full 16-channel frame (other channels keep their value)."""
+        frame = list(self.frame)
+        for idx, duty in enumerate(levels):
+            frame[self.channels[idx]] = duty
+        return frame
+
+    def mask_frame(self, mask, duty=FULL):
+        return self.levels_frame([duty if mask >> i & 1 else 0
+                                  for i in range(len(self.channels))])
+
+    # same calls as protocols.Driver so the states don't care which backend is used
+    def game_led(self, idx, on):
+        frame = list(self.frame)
+        frame[self.channels[idx]] = FULL if on else 0
+        self.show(frame)
+
+    def game_leds(self, mask):
+        self.show(self.mask_frame(mask))
+
+    # ---------------- Fades ----------------
+    def fade_frames(self, target, steps):
+        """Linear fade from the current frame to target, as whole frames."""
+        start = self.frame
+        return [[start[ch] + (target[ch] - start[ch]) * k // steps for ch in range(16)]
+                for k in range(1, steps + 1)]
+
+    def fade_to(self, target, seconds, fps=50):
+        steps = max(1, int(seconds * fps))
+        t = time.monotonic()
+        for frame in self.fade_frames(target, steps):
+            self.show(frame)
+            t += 1 / fps
+            time.sleep(max(0, t - time.monotonic()))
@@ -0,0 +1,299 @@
+"""
+Optional multi-process mode for Final_RaspberryPi.py (PIPELINE = True):
+
+  input process ──ring──▶ game process (the main script) ──ring──▶ output+audio process
+                                    ◀─────── ring (features, sync / swap replies) ──┘
+
+ – every stage has its own interpreter and GIL, so a slow WAV load or a burst of
+   serial writes in the output stage cannot hold up button sampling or game logic
+ – ShmRing is a single-producer / single-consumer ring of fixed-size records in
+   multiprocessing.shared_memory; head and tail are 32-bit counters, no locks;
+   masks travel as unsigned 64-bit fields, enough for a 64-tile floor
+ – on the game side every thread (lanes, the clock) writes the command ring
+   through RemoteOutputs.put, which takes a lock: one producer at a time
+ – the game process sees the same objects as the single-process mode: a button
+   source, an output driver, a clock — just backed by rings (buttons come from
+   Pi GPIO in this mode; Mega-side scanning needs the serial port in-process)
+ – stages are forked, never spawned: Final_RaspberryPi.py opens the hardware at
+   import time, and a spawned child would import it again (spawn / forkserver
+   re-import __main__; forkserver is the Linux default from Python 3.14)
+"""
+
+import struct, threading, time
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from types import SimpleNamespace
+
+from button_input import _Buttons
+from themes import discover
+
+Process = multiprocessing.get_context("fork").Process
+REC = struct.Struct("<qiQQ")               # t_ns, op, a, b
+IDX = struct.Struct("<I")
+HDR = 8                                    # head u32 @0, tail u32 @4
+
+# input → game
+EV_MASK = 1                                # a = pressed mask
+# game → output
+OP_LED, OP_WAIT, OP_PUMP = 10, 11, 12      # a = idx, b = on
+OP_LEDS, OP_WAITS, OP_PUMPS = 20, 21, 22   # a = mask
+OP_SOUND = 30                              # a = index into TRACKS, b = channel + 1 (0: music)
+OP_PREWARM = 31                            # same fields as OP_SOUND, nothing is played
+OP_TONE = 32                               # a = button index, or b = index into TONES
+OP_THEME = 33                              # a = index into THEMES, b = 0 preload / 1 swap
+OP_ATTRACT = 40                            # a = ms
+OP_SYNC, OP_AT = 50, 51                    # OP_AT: t_ns = when, a = bank, b = mask
+OP_QUIT = 99
+# output → game
+BK_FEATURES, BK_SYNC = 1, 2
+BK_THEME = 3                               # a = index into THEMES of the pack now playing
+
+TRACKS = [f"p{i}.wav" for i in range(1, 9)]
+TONES = (None, "error", "success")         # b of OP_TONE; None: the button tone a
+THEMES = sorted(discover())                # the same list in both processes
+FEATURES = ("acked", "timed", "scan", "attract")
+
+
+class ShmRing:
+    def __init__(self, shm, slots, owner):
+        self.shm, self.slots, self.owner = shm, slots, owner
+        self.buf = shm.buf
+        self.dropped = 0
+
+    @classmethod
+    def create(cls, slots=1024):
+        assert slots & (slots - 1) == 0, "slots must be a power of two"
+        shm = SharedMemory(create=True, size=HDR + slots * REC.size)
+        shm.buf[:HDR] = bytes(HDR)
+        return cls(shm, slots, owner=True)
+
+    @classmethod
+    def attach(cls, name, slots):
+        try:                               # only the creator may unlink it
+            shm = SharedMemory(name=name, track=False)            # 3.13+
+        except TypeError:                  # forked children share the creator's tracker
+            shm = SharedMemory(name=name)
+        return cls(shm, slots, owner=False)
+
+    def spec(self):
+        return self.shm.name, self.slots
+
+    # producer side
+    def put(self, op, a=0, b=0, t_ns=None, block=True):
+        head = IDX.unpack_from(self.buf, 0)[0]
+        delay = 0.0001
+        while (head - IDX.unpack_from(self.buf, 4)[0]) & 0xFFFFFFFF >= self.slots:
+            if not block:
+                self.dropped += 1
+                return False
+            time.sleep(delay); delay = min(delay * 2, 0.005)
+        if t_ns is None: t_ns = time.monotonic_ns()
+        REC.pack_into(self.buf, HDR + (head & (self.slots - 1)) * REC.size, t_ns, op, a, b)
+        IDX.pack_into(self.buf, 0, (head + 1) & 0xFFFFFFFF)       # publish after the write
+        return True
+
+    # consumer side
+    def get(self):
+        tail = IDX.unpack_from(self.buf, 4)[0]
+        if tail == IDX.unpack_from(self.buf, 0)[0]:
+            return None
+        rec = REC.unpack_from(self.buf, HDR + (tail & (self.slots - 1)) * REC.size)
+        IDX.pack_into(self.buf, 4, (tail + 1) & 0xFFFFFFFF)
+        return rec
+
+    def get_wait(self, timeout=None):
+        """Spin briefly, then back off up to 1 ms; None on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        spins, delay = 200, 0.00005
+        while True:
+            rec = self.get()
+            if rec is not None:
+                return rec
+            if spins:
+                spins -= 1
+                continue
+            if end is not None and time.monotonic() >= end:
+                return None
+            time.sleep(delay); delay = min(delay * 2, 0.001)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ---------------- Stage processes ----------------
+def input_main(ring_spec, pins):
+    from button_input import GpioButtons
+    ring = ShmRing.attach(*ring_spec)
+    buttons = GpioButtons(pins)
+    last = None
+    while True:
+        m = buttons.mask()
+        if m != last:
+            ring.put(EV_MASK, m)
+            last = m
+        buttons.wait_for(lambda cur: cur != last, 1.0)
+
+
+def output_main(cmd_spec, back_spec, ports, led_backend, pca_channels, theme):
+    import audio
+    from hardware import open_boards
+    from clock_sync import ClockSync
+    from shards import ShardedClock
+    cmd, back = ShmRing.attach(*cmd_spec), ShmRing.attach(*back_spec)
+    links, proto, out = open_boards(ports, led_backend, pca_channels)
+    clock = None
+    if proto.timed:
+        clocks = [ClockSync(l, lambda c, l=l: l.write((c + '\n').encode())) for l in links]
+        clock = clocks[0] if len(clocks) == 1 else ShardedClock(clocks, out)
+    audio.init(theme)
+    from tones import ToneBank
+    bank = ToneBank(out.n)
+    back.put(BK_FEATURES, sum(1 << i for i, f in enumerate(FEATURES) if getattr(proto, f)),
+             out.n)
+
+    single = {OP_LED: out.game_led, OP_WAIT: out.wait_led, OP_PUMP: out.pump}
+    masks = {OP_LEDS: out.game_leds, OP_WAITS: out.wait_leds, OP_PUMPS: out.pumps}
+    while True:
+        t_ns, op, a, b = cmd.get_wait()
+        if op in masks:        masks[op](a)
+        elif op in single:     single[op](a, bool(b))
+        elif op == OP_SOUND:   audio.play_sound_async(TRACKS[a], b - 1 if b else None)
+        elif op == OP_PREWARM: audio.prewarm(TRACKS[a], b - 1 if b else None)
+        elif op == OP_TONE:    bank.play(TONES[b] or a)
+        elif op == OP_THEME and b: back.put(BK_THEME, THEMES.index(audio.swap()))
+        elif op == OP_THEME:   audio.select(THEMES[a])
+        elif op == OP_ATTRACT: out.attract(a)
+        elif op == OP_AT:      clock.at(t_ns / 1e9, a, b)
+        elif op == OP_SYNC:    back.put(BK_SYNC, int(bool(clock and clock.sync())))
+        elif op == OP_QUIT:    break
+
+
+# ---------------- Game-side proxies ----------------
+class RemoteButtons(_Buttons):
+    def __init__(self, ring):
+        super().__init__()
+        self._mask = 0
+        self.ring = ring
+        self.latency = dict(n=0, sum_us=0.0, max_us=0.0)
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self):
+        while True:
+            rec = self.ring.get_wait(1.0)
+            if rec is None or rec[1] != EV_MASK:
+                continue
+            us = (time.monotonic_ns() - rec[0]) / 1000
+            lat = self.latency
+            lat['n'] += 1; lat['sum_us'] += us; lat['max_us'] = max(lat['max_us'], us)
+            self._mask = rec[2]
+            self._edge()
+
+    def mask(self):
+        return self._mask
+
+
+class RemoteOutputs:
+    """Same calls as protocols.Driver, queued to the output process. Any thread
+    may call them: put() serializes the writers of the single-producer ring."""
+
+    def __init__(self, ring):
+        self.ring = ring
+        self._lock = threading.Lock()
+
+    def put(self, op, a=0, b=0, t_ns=None, block=True):
+        with self._lock:
+            return self.ring.put(op, a, b, t_ns, block)
+
+    def game_led(self, idx, on): self.put(OP_LED, idx, int(on))
+    def wait_led(self, idx, on): self.put(OP_WAIT, idx, int(on))
+    def pump(self, idx, on):     self.put(OP_PUMP, idx, int(on))
+    def game_leds(self, mask):   self.put(OP_LEDS, mask)
+    def wait_leds(self, mask):   self.put(OP_WAITS, mask)
+    def pumps(self, mask):       self.put(OP_PUMPS, mask)
+    def attract(self, ms):       self.put(OP_ATTRACT, ms)
+    def play(self, filename, channel=None):
+        self.put(OP_SOUND, TRACKS.index(filename), 0 if channel is None else channel + 1)
+    def prewarm(self, filename, channel=None):
+        self.put(OP_PREWARM, TRACKS.index(filename), 0 if channel is None else channel + 1)
+    def tone(self, key):
+        self.put(OP_TONE, *((0, TONES.index(key)) if isinstance(key, str) else (key, 0)))
+    def select_theme(self, name):
+        self.put(OP_THEME, THEMES.index(name), 0)
+
+
+class RemoteClock:
+    def __init__(self, pipe):
+        self.pipe = pipe
+
+    def sync(self):
+        self.pipe.sync_reply.clear()
+        self.pipe.outputs.put(OP_SYNC)
+        return self.pipe.sync_reply.wait(3.0) and self.pipe.sync_ok
+
+    def at(self, t, bank, mask):
+        self.pipe.outputs.put(OP_AT, bank, mask, t_ns=int(t * 1e9))
+
+
+class Pipeline:
+    def __init__(self, pins, ports, led_backend="arduino", pca_channels=(), theme="music"):
+        self.inp, self.cmd, self.back = ShmRing.create(), ShmRing.create(), ShmRing.create()
+        self.procs = [
+            Process(target=input_main, args=(self.inp.spec(), pins), daemon=True),
+            Process(target=output_main, daemon=True,
+                    args=(self.cmd.spec(), self.back.spec(), ports, led_backend, pca_channels,
+                          theme)),
+        ]
+        for p in self.procs: p.start()
+
+        self.sync_reply, self.sync_ok = threading.Event(), False
+        self.theme_reply, self.theme = threading.Event(), theme
+        self._features = threading.Event()
+        threading.Thread(target=self._drain_back, daemon=True).start()
+        if not self._features.wait(10):
+            raise RuntimeError("output process did not start")
+        self.buttons = RemoteButtons(self.inp)
+        self.outputs = RemoteOutputs(self.cmd)
+        self.outputs.n = self.tiles
+        self.clock = RemoteClock(self) if self.proto.timed else None
+
+    def _drain_back(self):
+        while True:
+            rec = self.back.get_wait(1.0)
+            if rec is None:
+                continue
+            _, op, a, b = rec
+            if op == BK_FEATURES:                # b = number of tiles
+                self.proto = SimpleNamespace(name="remote", **{
+                    f: bool(a >> i & 1) for i, f in enumerate(FEATURES)})
+                self.tiles = b
+                self._features.set()
+            elif op == BK_SYNC:
+                self.sync_ok = bool(a)
+                self.sync_reply.set()
+            elif op == BK_THEME:
+                self.theme = THEMES[a]
+                self.theme_reply.set()
+
+    def swap_theme(self):
+        """audio.swap() in the output process → name of the pack it now plays,
+        or None if it did not answer in time (then nothing is known to have changed)."""
+        self.theme_reply.clear()
+        self.outputs.put(OP_THEME, 0, 1)
+        return self.theme if self.theme_reply.wait(1.0) else None
+
+    def health(self):
+        lat = self.buttons.latency
+        return dict(events=lat['n'],
+                    input_latency_avg_us=lat['sum_us'] / max(lat['n'], 1),
+                    input_latency_max_us=lat['max_us'],
+                    alive=[p.is_alive() for p in self.procs])
+
+    def close(self):
+        self.outputs.put(OP_QUIT, block=False)
+        for p in self.procs:
+            p.join(1)
+            if p.is_alive(): p.terminate()
+        for r in (self.inp, self.cmd, self.back): r.close()
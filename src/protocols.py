@@ -0,0 +1,134 @@
+"""
+Output protocols spoken by the Arduino firmwares in this repo, behind one driver:
+ – CharProtocol      Final_Test_V5–V7 / arduinotest.ino: '0'-'7' LED on, 'A'-'H' off
+ – OnOffProtocol     Test/Arduino_Code.ino: "ON n" / "OFF n" lines, 1-based, LEDs only
+ – TextProtocol      Final_Test_V8.ino: "LED_ON n" / "WAIT_ON n" / "PUMP_ON n" lines
+ – FountainProtocol  src/Final_Arduino.ino: TextProtocol + LEDS/WAITS/PUMPS masks,
+                     credit acks, SYNC/AT scheduling, SCAN button streaming and
+                     the on-board ATTRACT animation
+Every command is a bytes object built once at start-up; nothing is formatted or
+encoded per call. detect(link) picks the richest protocol the attached board answers.
+"""
+
+import threading, time
+
+GAME, WAIT, PUMP = 0, 1, 2             # bank ids (same numbering as the firmware's AT)
+
+
+class Protocol:
+    name = "?"
+    sizes = (8, 4, 8)                  # outputs per bank the firmware drives, 0 = none
+    acked = timed = scan = attract = False   # firmware features beyond plain outputs
+
+    def __init__(self):
+        self.on  = [[self.encode(b, i, True)  for i in range(n)] for b, n in enumerate(self.sizes)]
+        self.off = [[self.encode(b, i, False) for i in range(n)] for b, n in enumerate(self.sizes)]
+        self.masks = [None if self.encode_mask(b, 0) is None else
+                      [self.encode_mask(b, m) for m in range(1 << n)]
+                      for b, n in enumerate(self.sizes)]
+
+    def encode(self, bank, idx, on):
+        raise NotImplementedError
+
+    def encode_mask(self, bank, mask):
+        return None                    # no native bank write: Driver sends per-pin diffs
+
+
+class CharProtocol(Protocol):
+    name = "char"
+    sizes = (8, 0, 0)
+
+    def encode(self, bank, idx, on):
+        return bytes([(ord('0') if on else ord('A')) + idx])
+
+
+class OnOffProtocol(Protocol):
+    name = "on-off"
+    sizes = (8, 0, 0)
+
+    def encode(self, bank, idx, on):
+        return f"{'ON' if on else 'OFF'} {idx + 1}\n".encode()
+
+
+class TextProtocol(Protocol):
+    name = "text"
+    VERBS = ("LED", "WAIT", "PUMP")
+
+    def encode(self, bank, idx, on):
+        return f"{self.VERBS[bank]}_{'ON' if on else 'OFF'} {idx}\n".encode()
+
+
+class FountainProtocol(TextProtocol):
+    name = "fountain"
+    acked = timed = scan = attract = True
+    MASK_VERBS = ("LEDS", "WAITS", "PUMPS")
+
+    def encode_mask(self, bank, mask):
+        return f"{self.MASK_VERBS[bank]} {mask}\n".encode()
+
+
+class Driver:
+    """Bank/pin output calls → precomputed bytes written through a SerialLink."""
+
+    def __init__(self, proto, link):
+        self.proto = proto
+        self.link = link
+        self.state = [0, 0, 0]                  # last mask written per bank
+
+    def set(self, bank, idx, on):
+        if idx >= self.proto.sizes[bank]:
+            return                              # firmware has no such output
+        self.link.write((self.proto.on if on else self.proto.off)[bank][idx])
+        if on: self.state[bank] |= 1 << idx
+        else:  self.state[bank] &= ~(1 << idx)
+
+    def set_mask(self, bank, mask):
+        n = self.proto.sizes[bank]
+        mask &= (1 << n) - 1
+        table = self.proto.masks[bank]
+        if table is not None:
+            self.link.write(table[mask])
+        else:
+            diff = mask ^ self.state[bank]
+            on, off = self.proto.on[bank], self.proto.off[bank]
+            parts = [(on if mask >> i & 1 else off)[i] for i in range(n) if diff >> i & 1]
+            if parts:
+                self.link.write_lines(parts)
+        self.state[bank] = mask
+
+    def game_led(self, idx, on): self.set(GAME, idx, on)
+    def wait_led(self, idx, on): self.set(WAIT, idx, on)
+    def pump(self, idx, on):     self.set(PUMP, idx, on)
+    def game_leds(self, mask):   self.set_mask(GAME, mask)
+    def wait_leds(self, mask):   self.set_mask(WAIT, mask)
+    def pumps(self, mask):       self.set_mask(PUMP, mask)
+
+    def attract(self, ms):
+        """Start (ms > 0) or stop the firmware's own idle marquee."""
+        if self.proto.attract:
+            self.link.write(b"ATTRACT %d\n" % ms)
+
+
+# ---------------- Detection ----------------
+BANNERS = [                             # boot lines of the legacy sketches
+    (b"[Arduino] Ready", CharProtocol),
+    (b"Arduino ready.",  OnOffProtocol),
+]
+
+
+def detect(link, boot_wait=2.5, probe_wait=0.5):
+    """Pick a protocol from the boot banner (opening the port resets the board),
+    then probe with SYNC. Call on a fresh SerialLink created with window=None;
+    the caller turns credits on afterwards if the protocol is acked."""
+    deadline = time.monotonic() + boot_wait
+    while not link.is_ready() and time.monotonic() < deadline:
+        for line in list(link.unhandled):
+            for text, cls in BANNERS:
+                if line.endswith(text):
+                    return cls()
+        time.sleep(0.01)
+    # "Ready" (Final_Arduino, with or without acks) or silent (Final_Test_V8)
+    replied = threading.Event()
+    link.on(b"T ", lambda line: replied.set())
+    link.write(b"SYNC\n")
+    return FountainProtocol() if replied.wait(probe_wait) else TextProtocol()
@@ -0,0 +1,32 @@
+"""
+What the game does after a wrong press (RETRY_MODE in Final_RaspberryPi.py):
+ – "restart"   demo the whole sequence again and play from step 1 (the original game)
+ – "resume"    demo only the failed step and play on from it; cleared steps stay cleared
+ – "rollback"  go back `rollback` steps before the failed one, demo and replay from there
+plan() is all the states need: which step to play from and which steps to demo first.
+Test/Bench_Retry.py compares the modes on session length and players per hour;
+on a live floor, `session_store.py retry` reports the same from recorded sessions.
+"""
+
+MODES = ("restart", "resume", "rollback")
+
+
+class RetryPolicy:
+    def __init__(self, mode="resume", rollback=1):
+        if mode not in MODES:
+            raise ValueError(f"retry mode must be one of {MODES}, not {mode!r}")
+        self.mode, self.rollback = mode, rollback
+
+    def plan(self, failed):
+        """failed = 0-based index of the step that got a wrong press →
+        (step to play from, slice of the sequence to demo before it)."""
+        if self.mode == "restart":
+            start = 0
+        elif self.mode == "resume":
+            start = failed
+        else:
+            start = max(0, failed - self.rollback)
+        return start, slice(start, None if self.mode == "restart" else failed + 1)
+
+    def __str__(self):
+        return f"rollback {self.rollback}" if self.mode == "rollback" else self.mode
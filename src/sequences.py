@@ -0,0 +1,106 @@
+"""
+Step sequences for generate_state: every step is a k-tile target mask drawn from
+a precomputed table of all C(N, k) masks, not a fresh random.sample.
+ – per mask the table keeps its spread (bounding box of its tiles on the floor,
+   tile i at divmod(i, cols)); clustered targets make a group bump into each
+   other, so masks are drawn with weight 1 + spread
+ – a Walker alias table per k makes each weighted draw O(1)
+ – constraints against the previous step (never the same mask, at most
+   max_overlap shared tiles) are applied by redrawing; the bound is never
+   tighter than the floor allows, so the expected number of redraws stays O(1)
+ – when C(N, k) is bigger than TABLE_MAX (large floors) the table is skipped:
+   k tiles are sampled directly and accepted with probability weight / max weight,
+   which gives the same distribution in O(k) expected time
+ – one random.Random(seed) drives everything, so a seed replays the same sessions
+"""
+
+import random
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+TABLE_MAX = 1 << 16                    # masks per k kept in memory
+REDRAWS = 64                           # then give up on the constraints for this step
+
+
+class _Table:
+    """All k-tile masks with their spread, and an alias table over 1 + spread."""
+
+    def __init__(self, n, k, cols):
+        tiles = np.array(list(combinations(range(n), k)), dtype=np.int64)
+        self.masks = [int(m) for m in (np.int64(1) << tiles).sum(axis=1)] if n < 63 else \
+                     [sum(1 << int(i) for i in row) for row in tiles]
+        rows, cs = tiles // cols, tiles % cols
+        self.spread = (rows.max(axis=1) - rows.min(axis=1)) + (cs.max(axis=1) - cs.min(axis=1))
+        self.prob, self.alias = _alias(1.0 + self.spread)
+
+    def draw(self, rng):
+        i = rng.randrange(len(self.masks))
+        return self.masks[i] if rng.random() < self.prob[i] else self.masks[self.alias[i]]
+
+
+def _alias(weights):
+    """Vose's alias method: → (prob, alias), each O(len) lists."""
+    m = len(weights)
+    scaled = list(weights * m / weights.sum())
+    prob, alias = [1.0] * m, list(range(m))
+    small = [i for i, w in enumerate(scaled) if w < 1.0]
+    large = [i for i, w in enumerate(scaled) if w >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias
+
+
+class SequenceEngine:
+    def __init__(self, n, cols=4, seed=None, table_max=TABLE_MAX):
+        self.n, self.cols, self.table_max = n, cols, table_max
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self._tables = {}
+        self.redraws = 0                       # total, to check the constraints stay cheap
+
+    def table(self, k):
+        """The k-tile table, built on first use; None when it would be too big."""
+        if k not in self._tables:
+            self._tables[k] = _Table(self.n, k, self.cols) if comb(self.n, k) <= self.table_max \
+                              else None
+        return self._tables[k]
+
+    def spread(self, mask):
+        rows, cols = zip(*(divmod(i, self.cols) for i in range(self.n) if mask >> i & 1))
+        return max(rows) - min(rows) + max(cols) - min(cols)
+
+    def _draw(self, k):
+        table = self.table(k)
+        if table is not None:
+            return table.draw(self.rng)
+        top = 1 + (self.n - 1) // self.cols + min(self.n, self.cols) - 1   # widest spread + 1
+        while True:
+            mask = sum(1 << i for i in self.rng.sample(range(self.n), k))
+            if self.rng.random() * top < 1 + self.spread(mask):
+                return mask
+
+    def max_overlap(self, k):
+        """Tiles a step may share with the one before: half of them, or as few as fit."""
+        return max(k // 2, 2 * k - self.n)
+
+    def step(self, k, prev=0):
+        """One k-tile mask that is not prev and shares at most max_overlap(k) tiles with it."""
+        limit = self.max_overlap(k)
+        for _ in range(REDRAWS):
+            mask = self._draw(k)
+            if mask != prev and (mask & prev).bit_count() <= limit:
+                return mask
+            self.redraws += 1
+        return mask                            # k == N: there is only one mask
+
+    def sequence(self, stepnum, k):
+        steps, prev = [], 0
+        for _ in range(stepnum):
+            prev = self.step(k, prev)
+            steps.append(prev)
+        return steps
@@ -0,0 +1,127 @@
+"""
+Acknowledged serial link to the Arduino Mega:
+ – credit-based flow control against the Mega's 64-byte RX buffer
+ – background reader thread turns K/S/Ready frames into credits and health counters
+ – other frames are handed to listeners registered with on(prefix, fn)
+ – window=None turns credits off for legacy firmwares that never ack
+"""
+
+import threading, time
+from collections import deque
+
+RX_WINDOW = 64             # SERIAL_RX_BUFFER_SIZE on the Mega
+CREDIT_TIMEOUT = 1.0       # no ack for this long → assume bytes were lost, resync
+
+
+class SerialLink:
+    def __init__(self, ser, window=RX_WINDOW):
+        self.ser = ser
+        self.window = window                    # None → write without waiting for credit
+        self._cv = threading.Condition()
+        self._inflight = 0                      # bytes written but not yet acked
+        self._ready = threading.Event()
+        self._handlers = {}
+        self.unhandled = deque(maxlen=8)        # recent lines no listener claimed
+        self.stats = dict(sent_bytes=0, acked_bytes=0, sent_cmds=0,
+                          applied=0, errors=0, resets=0, stalls=0,
+                          free=window, min_free=window, uptime_ms=0,
+                          last_status=0.0)
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    # ---------------- Writing ----------------
+    def write(self, data: bytes, cmds=1):
+        """Block until the Mega has room for data, then write it."""
+        n, window = len(data), self.window
+        if window is not None and n > window:
+            raise ValueError(f"{n}-byte write exceeds {window}-byte window")
+        with self._cv:
+            if window is not None and not self._cv.wait_for(
+                    lambda: self._inflight + n <= window, CREDIT_TIMEOUT):
+                self.stats['stalls'] += 1
+                self._inflight = 0
+            self._inflight += n
+            self.stats['sent_bytes'] += n
+            self.stats['sent_cmds'] += cmds
+        self.ser.write(data)
+
+    def write_lines(self, lines):
+        """Send many b'...\\n' lines, packing as many as the credit allows per write."""
+        chunk, count = b"", 0
+        window = self.window or float('inf')
+        for line in lines:
+            if len(chunk) + len(line) > window:
+                self.write(chunk, count)
+                chunk, count = b"", 0
+            chunk += line
+            count += 1
+        if chunk:
+            self.write(chunk, count)
+
+    # ---------------- Reading ----------------
+    def on(self, prefix: bytes, fn):
+        """Call fn(line) for every incoming line starting with prefix."""
+        self._handlers[prefix] = fn
+
+    def wait_ready(self, timeout=3.0):
+        """Wait for the boot banner; False means the board never announced itself."""
+        return self._ready.wait(timeout)
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def _reader(self):
+        while True:
+            try:
+                line = self.ser.readline().strip()
+            except Exception as e:
+                print("Serial read error:", e)
+                time.sleep(0.5)
+                continue
+            if not line:
+                continue
+            if line[:1] == b'K' and line[1:].isdigit():
+                with self._cv:
+                    n = int(line[1:])
+                    self._inflight = max(0, self._inflight - n)
+                    self.stats['acked_bytes'] += n
+                    self._cv.notify_all()
+            elif line.startswith(b'S '):
+                self._status(line)
+            elif line == b'Ready':
+                with self._cv:
+                    if self._ready.is_set():
+                        self.stats['resets'] += 1
+                        print("Arduino reset detected")
+                    self._inflight = 0
+                    self.stats.update(sent_cmds=0, uptime_ms=0)   # counters restart at boot
+                    self._cv.notify_all()
+                self._ready.set()
+            else:
+                for prefix, fn in self._handlers.items():
+                    if line.startswith(prefix):
+                        fn(line)
+                        break
+                else:
+                    self.unhandled.append(line)
+
+    def _status(self, line):
+        try:
+            free, min_free, applied, errors, uptime = map(int, line.split()[1:6])
+        except ValueError:
+            return
+        with self._cv:
+            s = self.stats
+            if uptime < s['uptime_ms']:             # rebooted without us seeing Ready
+                s['resets'] += 1
+            s.update(free=free, min_free=min_free, applied=applied, errors=errors,
+                     uptime_ms=uptime, last_status=time.monotonic())
+
+    # ---------------- Health ----------------
+    def health(self):
+        """Snapshot of link counters plus derived loss / staleness figures."""
+        with self._cv:
+            h = dict(self.stats, inflight=self._inflight)
+        h['unaccounted'] = h['sent_cmds'] - h['applied'] - h['errors']
+        h['status_age'] = (time.monotonic() - h['last_status']
+                           if h['last_status'] else None)
+        return h
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Session statistics in SQLite (sessions.db next to the script):
+ – one row per session (players, sequence, attempts, won), per step attempt
+   (targets, completion time, wrong press) and per button press (raw events,
+   moved to columnar chunks by compact_logs.py)
+ – the game loop only puts tuples on a queue; a writer thread commits them in
+   batches (every BATCH rows or FLUSH_S seconds) in WAL mode with
+   synchronous=NORMAL, so no state ever waits on fsync
+ – a per-day rollup table is updated in the same transaction, so daily reports
+   read one indexed row per day however many years of sessions there are
+
+CLI:
+  python3 session_store.py [--db sessions.db] daily [--days 30]
+  python3 session_store.py [--db sessions.db] steps [--days 30]
+  python3 session_store.py [--db sessions.db] retry [--days 30]
+  python3 session_store.py [--db sessions.db] pacing [--days 30]
+"""
+
+import argparse, datetime, os, queue, sqlite3, threading, time
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db")
+BATCH, FLUSH_S = 64, 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id       INTEGER PRIMARY KEY,      -- start time in ms
+    day      TEXT    NOT NULL,         -- local date, YYYY-MM-DD
+    started  REAL    NOT NULL,
+    ended    REAL,
+    players  INTEGER NOT NULL,
+    sequence TEXT    NOT NULL,         -- step target masks, comma separated
+    attempts INTEGER,
+    won      INTEGER,
+    retry    TEXT,                     -- retry_policy mode the session ran with
+    pace     REAL                      -- pacing busy level 0..1 at the end
+);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions(day);
+CREATE TABLE IF NOT EXISTS steps (
+    session  INTEGER NOT NULL,
+    attempt  INTEGER NOT NULL,
+    step     INTEGER NOT NULL,
+    targets  INTEGER NOT NULL,         -- bit mask
+    duration REAL    NOT NULL,         -- s from step start to cleared / wrong press
+    wrong    INTEGER,                  -- index of the wrong button, NULL if cleared
+    PRIMARY KEY (session, attempt, step)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (         -- archived per session by compact_logs.py
+    session  INTEGER NOT NULL,
+    attempt  INTEGER NOT NULL,
+    step     INTEGER NOT NULL,
+    t        REAL    NOT NULL,         -- s since the step started
+    button   INTEGER NOT NULL,
+    correct  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day       TEXT PRIMARY KEY,
+    sessions  INTEGER NOT NULL DEFAULT 0,
+    won       INTEGER NOT NULL DEFAULT 0,
+    players   INTEGER NOT NULL DEFAULT 0,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    play_s    REAL    NOT NULL DEFAULT 0,
+    steps     INTEGER NOT NULL DEFAULT 0,
+    wrong     INTEGER NOT NULL DEFAULT 0,
+    step_s    REAL    NOT NULL DEFAULT 0,   -- summed durations of cleared steps
+    first     REAL,
+    last      REAL
+) WITHOUT ROWID;
+"""
+
+
+def connect(path=DB_PATH):
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")     # WAL: durable at checkpoints, no fsync per commit
+    db.executescript(SCHEMA)
+    for column in ("retry TEXT", "pace REAL"):  # added after the first databases were made
+        try:
+            db.execute(f"ALTER TABLE sessions ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    return db
+
+
+class SessionStore:
+    """Non-blocking recorder; every call just enqueues a row for the writer thread."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.q = queue.SimpleQueue()
+        self.written = self.batches = 0
+        self._open = {}                         # session id → (day, started, players)
+        self._last_sid = 0
+        self._sid_lock = threading.Lock()       # lanes may begin in the same millisecond
+        threading.Thread(target=self._writer, daemon=True).start()
+
+    # ---------------- Game side ----------------
+    def begin(self, players, sequence, retry=None):
+        """New session; sequence is a list of steps, each a target bit mask."""
+        started = time.time()
+        with self._sid_lock:
+            sid = self._last_sid = max(int(started * 1000), self._last_sid + 1)
+        day = datetime.date.fromtimestamp(started).isoformat()
+        masks = ",".join(map(str, sequence))
+        self._open[sid] = (day, started, players)
+        self.q.put(("session", sid, day, started, players, masks, retry))
+        return sid
+
+    def step(self, sid, attempt, step, targets, duration, wrong=None):
+        self.q.put(("step", self._open[sid][0], sid, attempt, step,
+                    targets, duration, wrong))
+
+    def press(self, sid, attempt, step, button, t, correct):
+        self.q.put(("press", sid, attempt, step, t, button, int(correct)))
+
+    def end(self, sid, attempts, won=True, pace=None):
+        day, started, players = self._open.pop(sid)
+        self.q.put(("end", sid, day, started, time.time(), players, attempts, int(won), pace))
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far is committed (tests, shutdown)."""
+        done = threading.Event()
+        self.q.put(("flush", done))
+        return done.wait(timeout)
+
+    # ---------------- Writer thread ----------------
+    def _writer(self):
+        db = connect(self.path)
+        while True:
+            batch = [self.q.get()]
+            deadline = time.monotonic() + FLUSH_S
+            while len(batch) < BATCH and batch[-1][0] != "flush":
+                try:
+                    batch.append(self.q.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with db:                        # one transaction per batch
+                    for row in batch:
+                        self._apply(db, row)
+            except sqlite3.Error as e:
+                print("Session store error:", e)
+            self.batches += 1
+            self.written += len(batch)
+            if batch[-1][0] == "flush":
+                batch[-1][1].set()
+
+    @staticmethod
+    def _apply(db, row):
+        kind, args = row[0], row[1:]
+        if kind == "session":
+            db.execute("INSERT OR REPLACE INTO sessions (id, day, started, players, sequence, retry) "
+                       "VALUES (?, ?, ?, ?, ?, ?)", args)
+        elif kind == "step":
+            day, sid, attempt, step, targets, duration, wrong = args
+            db.execute("INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?, ?)", args[1:])
+            db.execute("""INSERT INTO daily (day, steps, wrong, step_s) VALUES (?, 1, ?, ?)
+                          ON CONFLICT(day) DO UPDATE SET steps = steps + 1,
+                              wrong = wrong + excluded.wrong, step_s = step_s + excluded.step_s""",
+                       (day, int(wrong is not None), duration if wrong is None else 0.0))
+        elif kind == "press":
+            db.execute("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", args)
+        elif kind == "end":
+            sid, day, started, ended, players, attempts, won, pace = args
+            db.execute("UPDATE sessions SET ended = ?, attempts = ?, won = ?, pace = ? WHERE id = ?",
+                       (ended, attempts, won, pace, sid))
+            db.execute("""INSERT INTO daily (day, sessions, won, players, attempts, play_s, first, last)
+                          VALUES (?, 1, ?, ?, ?, ?, ?, ?)
+                          ON CONFLICT(day) DO UPDATE SET sessions = sessions + 1,
+                              won = won + excluded.won, players = players + excluded.players,
+                              attempts = attempts + excluded.attempts,
+                              play_s = play_s + excluded.play_s,
+                              first = min(coalesce(first, excluded.first), excluded.first),
+                              last = max(coalesce(last, excluded.last), excluded.last)""",
+                       (day, won, players, attempts, ended - started, started, ended))
+
+
+# ---------------- Queries ----------------
+def daily(db, days=30):
+    since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    return db.execute("""
+        SELECT day, sessions, players,
+               CAST(sessions AS REAL) / max((last - first) / 3600.0, 1.0 / 60) AS per_hour,
+               CAST(attempts - sessions AS REAL) / max(sessions, 1) AS retries,
+               play_s / max(sessions, 1), step_s / max(steps - wrong, 1),
+               CAST(wrong AS REAL) / max(steps, 1)
+        FROM daily WHERE day >= ? ORDER BY day""", (since,)).fetchall()
+
+
+def step_times(db, days=30):
+    """Average completion time per (player count, step) over cleared steps."""
+    since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    return db.execute("""
+        SELECT s.players, t.step, count(*), avg(CASE WHEN t.wrong IS NULL THEN t.duration END), sum(t.wrong IS NOT NULL)
+        FROM sessions s JOIN steps t ON t.session = s.id
+        WHERE s.day >= ?
+        GROUP BY s.players, t.step ORDER BY s.players, t.step""", (since,)).fetchall()
+
+
+def retry_modes(db, days=30):
+    """Per retry mode: sessions, avg length, avg attempts, players per hour of play."""
+    since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    return db.execute("""
+        SELECT coalesce(retry, 'restart'), count(*), avg(ended - started), avg(attempts),
+               sum(players) / max(sum(ended - started) / 3600.0, 1.0 / 60)
+        FROM sessions WHERE day >= ? AND ended IS NOT NULL
+        GROUP BY 1 ORDER BY 1""", (since,)).fetchall()
+
+
+def pacing(db, days=30):
+    """Per busy level (rounded to 0.25): sessions, avg length, players per hour of play."""
+    since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    return db.execute("""
+        SELECT round(coalesce(pace, 0) * 4) / 4 AS level, count(*), avg(ended - started),
+               sum(players) / max(sum(ended - started) / 3600.0, 1.0 / 60)
+        FROM sessions WHERE day >= ? AND ended IS NOT NULL
+        GROUP BY level ORDER BY level""", (since,)).fetchall()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fountain floor session statistics")
+    ap.add_argument("--db", default=DB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("daily", "steps", "retry", "pacing"):
+        sub.add_parser(name).add_argument("--days", type=int, default=30)
+    args = ap.parse_args(argv)
+    db = connect(args.db)
+    if args.cmd == "daily":
+        print(f"{'day':<11}{'sess':>6}{'players':>9}{'sess/h':>9}{'retry':>7}"
+              f"{'avg s':>7}{'step s':>8}{'wrong':>7}")
+        for day, n, players, rate, retry, play_s, step_s, wrong in daily(db, args.days):
+            print(f"{day:<11}{n:>6}{players:>9}{rate:>9.1f}{retry:>7.2f}"
+                  f"{play_s:>7.1f}{step_s:>8.2f}{wrong:>7.1%}")
+    elif args.cmd == "pacing":
+        print(f"{'level':>5}{'sess':>6}{'avg s':>7}{'players/h':>10}")
+        for level, n, length, rate in pacing(db, args.days):
+            print(f"{level:>5.2f}{n:>6}{length:>7.1f}{rate:>10.1f}")
+    elif args.cmd == "retry":
+        print(f"{'mode':<12}{'sess':>6}{'avg s':>7}{'tries':>7}{'players/h':>10}")
+        for mode, n, length, tries, rate in retry_modes(db, args.days):
+            print(f"{mode:<12}{n:>6}{length:>7.1f}{tries:>7.2f}{rate:>10.1f}")
+    else:
+        print(f"{'players':>7}{'step':>5}{'n':>7}{'avg s':>7}{'wrong':>7}")
+        for players, step, n, avg, wrong in step_times(db, args.days):
+            print(f"{players:>7}{step:>5}{n:>7}{avg or 0:>7.2f}{wrong:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Floors bigger than one Mega: tiles are numbered globally and split over several
+output boards in port order, board k owning the next widths[k] tiles.
+ – ShardedOutputs has the calls of protocols.Driver; a global bit mask is cut
+   into per-board slices and only boards whose slice changed are written, so a
+   frame that touches one corner of a 64-tile floor costs one board's command
+ – ShardedClock has the calls of clock_sync.ClockSync, one AT per board
+ – the four wait LEDs stay on the first board
+"""
+
+from itertools import accumulate
+
+from protocols import GAME, WAIT, PUMP
+
+CALLS = {GAME: ("game_led", "game_leds"), PUMP: ("pump", "pumps")}   # per-board methods
+
+
+class ShardedOutputs:
+    def __init__(self, outs, widths):
+        self.outs, self.widths = list(outs), list(widths)
+        self.shifts = [0, *accumulate(self.widths)][:-1]
+        self.n = sum(self.widths)
+        self.route = [(k, i) for k, w in enumerate(self.widths) for i in range(w)]
+        self.last = {GAME: [None] * len(self.outs), PUMP: [None] * len(self.outs)}
+
+    def split(self, mask):
+        return [mask >> s & (1 << w) - 1 for s, w in zip(self.shifts, self.widths)]
+
+    def _set(self, bank, idx, on):
+        k, i = self.route[idx]
+        getattr(self.outs[k], CALLS[bank][0])(i, on)     # may be a PCA9685 override
+        last = self.last[bank]
+        if last[k] is not None:
+            last[k] = last[k] | 1 << i if on else last[k] & ~(1 << i)
+
+    def _set_mask(self, bank, mask):
+        last = self.last[bank]
+        for k, part in enumerate(self.split(mask)):
+            if part != last[k]:
+                getattr(self.outs[k], CALLS[bank][1])(part)
+                last[k] = part
+
+    def game_led(self, idx, on): self._set(GAME, idx, on)
+    def pump(self, idx, on):     self._set(PUMP, idx, on)
+    def game_leds(self, mask):   self._set_mask(GAME, mask)
+    def pumps(self, mask):       self._set_mask(PUMP, mask)
+    def wait_led(self, idx, on): self.outs[0].wait_led(idx, on)
+    def wait_leds(self, mask):   self.outs[0].wait_leds(mask)
+
+    def attract(self, ms):
+        for out in self.outs:
+            out.attract(ms)
+        self.last[GAME] = [None if ms else 0] * len(self.outs)   # the boards animate on their own
+
+
+class ShardedClock:
+    def __init__(self, clocks, outputs):
+        self.clocks, self.split = list(clocks), outputs.split
+
+    def sync(self):
+        return all([c.sync() for c in self.clocks])   # every board, even after a failure
+
+    def at(self, t, bank, mask):
+        if bank == WAIT:
+            self.clocks[0].at(t, bank, mask)
+            return
+        for clock, part in zip(self.clocks, self.split(mask)):
+            clock.at(t, bank, part)
+
+    def cancel(self):
+        for c in self.clocks:
+            c.cancel()
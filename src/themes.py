@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sound theme packs: every directory next to the game holding stage tracks
+(p1.wav ...) is a pack named after it — today music/ and src/HP/.
+ – a pack is the tracks of its directory, with the DEFAULT pack filling in
+   whatever it lacks (HP has no p8.wav)
+ – the pack in use is decoded into Sounds up front, so nothing is read or
+   decoded while a session plays; float32 tracks at the mixer's rate are
+   converted to its int16 straight from their memory mapping (wavmap.py) into
+   a buffer of exactly their size, where SDL's loader keeps a conversion
+   buffer up to twice that; every Sound still owns its samples, nothing is
+   shared through the page cache (Test/Bench_WavLoad.py)
+ – preload() decodes the next pack in a background thread while the current
+   one keeps playing; swap() between sessions switches to it with one
+   assignment if it is ready, and otherwise keeps the current pack and never waits
+ – at most two packs are resident (current + next); the old one goes at the swap
+ – memory per pack: report() for decoded packs, or from the WAV headers only:
+     python3 themes.py
+"""
+
+import os, sys, threading, time
+
+import numpy as np
+
+from wavmap import WavMap, FLOAT
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOTS = [os.path.join(HERE, ".."), HERE]
+DEFAULT = "music"
+MIXER_RATE, MIXER_SIZE, MIXER_CHANNELS = 44100, -16, 2  # int16 stereo, see audio.init
+
+
+def discover(roots=ROOTS):
+    """{pack name: directory} for every directory with a p1.wav."""
+    packs = {}
+    for root in roots:
+        for name in sorted(os.listdir(root)):
+            path = os.path.abspath(os.path.join(root, name))
+            if name not in packs and os.path.isfile(os.path.join(path, "p1.wav")):
+                packs[name] = path
+    return packs
+
+
+class Pack:
+    def __init__(self, name, path, fallback=None):
+        self.name, self.path = name, path
+        self.files = dict(fallback.files) if fallback else {}
+        for f in sorted(os.listdir(path)):
+            if f.lower().endswith(".wav"):
+                self.files[f] = os.path.join(path, f)
+        self.sounds = {}
+        self.load_s = 0.0
+
+    def sound(self, name):
+        """One track as a pygame Sound in the mixer's format: converted here from
+        the mapping if it is float at the mixer's rate, else decoded by SDL."""
+        import pygame
+        rate, size, channels = pygame.mixer.get_init()
+        wav = WavMap(self.files[name])
+        if ((wav.tag, wav.bits, wav.rate, size) == (FLOAT, 32, rate, -16)
+                and wav.channels in (1, channels)):
+            pcm = (np.clip(wav.array(), -1, 1) * 32767).astype(np.int16)
+            return pygame.mixer.Sound(buffer=np.repeat(pcm, channels // wav.channels, axis=1))
+        return pygame.mixer.Sound(self.files[name])
+
+    def load(self):
+        """Decode every track into a Sound (slow: call off the game thread)."""
+        t0 = time.monotonic()
+        self.sounds = {f: self.sound(f) for f in self.files}
+        self.load_s = time.monotonic() - t0
+        return self
+
+    def decoded_bytes(self, rate=MIXER_RATE, size=MIXER_SIZE, channels=MIXER_CHANNELS):
+        """Bytes once loaded, resampled to the mixer format; only headers are read."""
+        total = 0
+        for p in self.files.values():
+            wav = WavMap(p)
+            total += int(wav.frames * rate / wav.rate) * channels * abs(size) // 8
+        return total
+
+    def file_bytes(self):
+        return sum(os.path.getsize(p) for p in self.files.values())
+
+
+class Themes:
+    def __init__(self, roots=ROOTS, default=DEFAULT):
+        self.paths = discover(roots)
+        self.default = Pack(default, self.paths[default])
+        self.current = None
+        self._next, self._loading = None, None
+
+    def pack(self, name):
+        if name == self.default.name:
+            return Pack(name, self.paths[name])
+        return Pack(name, self.paths[name], self.default)
+
+    def load_now(self, name):
+        """Start-up: decode name and make it current."""
+        self.current = self.pack(name).load()
+        return self.current
+
+    def preload(self, name):
+        """Decode name in the background for the next swap()."""
+        if (self.current and self.current.name == name) or name not in self.paths:
+            return
+        nxt = self.pack(name)
+        self._next, self._loading = None, nxt
+
+        def _worker():
+            nxt.load()
+            if self._loading is nxt:               # not overtaken by another preload
+                self._next = nxt
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def swap(self):
+        """Between sessions: switch to the preloaded pack if it is ready → current pack."""
+        nxt = self._next
+        if nxt is not None:
+            self.current, self._next, self._loading = nxt, None, None
+        return self.current
+
+    def report(self):
+        """[(name, files MiB, decoded MiB, resident)] for every discovered pack."""
+        resident = {p.name for p in (self.current, self._next) if p is not None}
+        rows = []
+        for name in self.paths:
+            p = self.pack(name)
+            rows.append((name, p.file_bytes() / 2**20, p.decoded_bytes() / 2**20,
+                         name in resident))
+        return rows
+
+
+if __name__ == "__main__":
+    themes = Themes(sys.argv[1:] or ROOTS)
+    print(f"{'pack':<10}{'tracks':>7}{'files MiB':>11}{'decoded MiB':>13}")
+    for name in themes.paths:
+        p = themes.pack(name)
+        print(f"{name:<10}{len(p.files):>7}{p.file_bytes() / 2**20:>11.1f}"
+              f"{p.decoded_bytes() / 2**20:>13.1f}")
@@ -0,0 +1,67 @@
+"""
+Drift-free timing for the game states, on time.monotonic():
+ – Ticker(name, period).wait() sleeps to the next deadline on a fixed grid, so
+   time spent on serial writes inside the loop is absorbed instead of added
+ – at(offset) sleeps to start + offset, for one-off timelines (demo, gaps)
+ – wait(block) hands the remaining time to block(timeout), e.g. a button wait;
+   a truthy result means "woke early" and leaves the deadline in place
+ – overruns are counted as missed deadlines and skipped, never replayed in a burst
+ – report() summarises jitter and misses of every ticker created so far
+"""
+
+import time
+
+TICKERS = {}                           # name → stats dict, kept across sessions
+
+
+class Ticker:
+    def __init__(self, name, period=None):
+        self.period = period
+        self.start = time.monotonic()
+        self.deadline = self.start + (period or 0)
+        self.stats = TICKERS.setdefault(
+            name, dict(ticks=0, missed=0, jitter_sum=0.0, jitter_max=0.0))
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _sleep_to(self, deadline, block=None):
+        now = time.monotonic()
+        if now < deadline:
+            if block and block(deadline - now):
+                return True
+            while (now := time.monotonic()) < deadline:   # sleep() may wake a hair early
+                time.sleep(deadline - now)
+        s = self.stats
+        late = now - deadline
+        s['ticks'] += 1
+        s['jitter_sum'] += late
+        s['jitter_max'] = max(s['jitter_max'], late)
+        return False
+
+    def wait(self, block=None):
+        """Sleep to the next grid deadline; True if block() woke us first."""
+        if self.deadline < time.monotonic() - self.period:      # overran whole periods
+            skipped = int((time.monotonic() - self.deadline) // self.period)
+            self.stats['missed'] += skipped
+            self.deadline += skipped * self.period
+        if self._sleep_to(self.deadline, block):
+            return True
+        self.deadline += self.period
+        return False
+
+    def at(self, offset, block=None):
+        """Sleep until start + offset seconds; True if block() woke us first."""
+        if time.monotonic() > self.start + offset + 0.001:
+            self.stats['missed'] += 1
+        return self._sleep_to(self.start + offset, block)
+
+
+def report():
+    out = []
+    for name, s in TICKERS.items():
+        n = max(s['ticks'], 1)
+        out.append(f"{name}: {s['ticks']} ticks, {s['missed']} missed, "
+                   f"jitter avg {s['jitter_sum'] / n * 1000:.2f} ms "
+                   f"max {s['jitter_max'] * 1000:.2f} ms")
+    return "\n".join(out)
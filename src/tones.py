@@ -0,0 +1,105 @@
+"""
+Per-press feedback sounds, synthesized once at startup with NumPy:
+ – one short tone per button, rising through a major pentatonic scale from C5
+   so neighbouring tiles sound related (past three octaves it starts over)
+ – an "error" buzz for wrong presses and a "success" arpeggio for cleared steps
+ – the whole button bank is one vectorized render (buttons × samples), then each
+   row becomes a pygame.mixer.Sound built straight from a buffer in the mixer's format
+ – play() only hands a ready Sound to the voice pool (mixer.py): nothing is decoded,
+   read or allocated on the press path; latency is the mixer buffer (AUDIO_BUFFER
+   in audio.py) plus the call, see ToneBank.latency_ms() and Test/Bench_Tones.py
+"""
+
+import time
+
+import numpy as np
+
+import audio
+
+RATE = 44100
+PENTATONIC = (0, 2, 4, 7, 9)           # semitones above the octave's root
+ROOT_HZ = 523.25                       # C5
+OCTAVES = 3
+TONE_S, ERROR_S, SUCCESS_S = 0.15, 0.35, 0.5
+VOLUME = 0.5
+KIND = {"error": "error", "success": "stage"}   # mixer voice kind; buttons are "press"
+
+
+def button_freqs(n):
+    """Up the scale over OCTAVES octaves, then round again (big floors)."""
+    semis = np.array([PENTATONIC[i % 5] + 12 * (i // 5 % OCTAVES) for i in range(n)])
+    return ROOT_HZ * 2.0 ** (semis / 12)
+
+
+def envelope(samples, rate, attack=0.005, decay=8.0):
+    t = np.arange(samples) / rate
+    return np.minimum(t / attack, 1.0) * np.exp(-decay * t)
+
+
+def render_buttons(n, rate=RATE):
+    """(n, samples) float32: a bell-ish tone per button, fundamental + two partials."""
+    t = np.arange(int(TONE_S * rate)) / rate
+    phase = 2 * np.pi * button_freqs(n)[:, None] * t[None, :]
+    wave = np.sin(phase) + 0.3 * np.sin(2 * phase) + 0.1 * np.sin(3 * phase)
+    return (wave / 1.4 * envelope(len(t), rate, decay=20.0)).astype(np.float32)
+
+
+def render_error(rate=RATE):
+    """Two detuned low square waves: a short, unmistakable buzz."""
+    t = np.arange(int(ERROR_S * rate)) / rate
+    wave = np.sign(np.sin(2 * np.pi * 110 * t)) + np.sign(np.sin(2 * np.pi * 116.5 * t))
+    return (wave / 2 * envelope(len(t), rate, decay=6.0)).astype(np.float32)
+
+
+def render_success(rate=RATE):
+    """C-E-G-C arpeggio, each note held to the end so it closes on the chord."""
+    t = np.arange(int(SUCCESS_S * rate)) / rate
+    wave = np.zeros_like(t)
+    for k, f in enumerate(ROOT_HZ * 2.0 ** (np.array([0, 4, 7, 12]) / 12)):
+        start = 0.06 * k
+        on = t >= start
+        wave[on] += np.sin(2 * np.pi * f * (t[on] - start)) * envelope(on.sum(), rate, decay=5.0)
+    return (wave / 4).astype(np.float32)
+
+
+def to_pcm(wave, channels=2, size=-16):
+    """float [-1, 1] → interleaved frames in the mixer's format (size as
+    pygame.mixer.get_init() reports it: 32 float32, else int16), C-contiguous."""
+    pcm = np.clip(wave * VOLUME, -1, 1)
+    pcm = pcm.astype(np.float32) if size == 32 else (pcm * 32767).astype(np.int16)
+    return np.ascontiguousarray(np.repeat(pcm[:, None], channels, axis=1))
+
+
+class ToneBank:
+    """keys: button index 0..n-1, "error", "success"."""
+
+    def __init__(self, n):
+        import pygame
+        rate, size, channels = pygame.mixer.get_init()
+        t0 = time.perf_counter()
+        waves = dict(enumerate(render_buttons(n, rate)))
+        waves["error"], waves["success"] = render_error(rate), render_success(rate)
+        pcm = {k: to_pcm(w, channels, size) for k, w in waves.items()}
+        self.sounds = {k: pygame.mixer.Sound(buffer=p.tobytes()) for k, p in pcm.items()}
+        self.render_ms = (time.perf_counter() - t0) * 1000
+        self.bytes = sum(p.nbytes for p in pcm.values())
+        self.rate = rate
+
+    def play(self, key):
+        sound = self.sounds.get(key)
+        if sound is not None:
+            audio.mixer.play(sound, KIND.get(key, "press"))
+
+    def latency_ms(self, trials=50):
+        """Mixer buffer period + the slowest of `trials` play() calls (muted)."""
+        snd = self.sounds[0]
+        vol = snd.get_volume()
+        snd.set_volume(0)
+        worst = 0.0
+        for _ in range(trials):
+            t0 = time.perf_counter()
+            audio.mixer.play(snd, "press")
+            worst = max(worst, time.perf_counter() - t0)
+        snd.stop()
+        snd.set_volume(vol)
+        return audio.AUDIO_BUFFER / self.rate * 1000 + worst * 1000
@@ -0,0 +1,55 @@
+"""
+Memory-mapped WAV files: the RIFF header is parsed in place and the PCM chunk
+is handed out as a memoryview of the mapping, never read into the Python heap.
+ – pages come from the OS page cache and are shared by every process that maps
+   the same file (pipeline stages, audio_analysis, a second game instance)
+ – array() views the PCM as a NumPy (frames, channels) array without a copy:
+   audio_analysis reads tracks this way, themes.py converts them from it
+ – playback cannot share it: a pygame Sound always copies its samples into its
+   own buffer, so the mixer's tracks are private memory whatever the loader
+ – Test/Bench_WavLoad.py compares load time and RSS with the pygame paths
+"""
+
+import mmap, struct
+
+import numpy as np
+
+PCM, FLOAT, EXTENSIBLE = 1, 3, 0xFFFE
+
+
+class WavMap:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self.mm
+        if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+        pos, fmt, data = 12, None, None
+        while pos + 8 <= len(mm):
+            cid, size = mm[pos:pos + 4], struct.unpack_from("<I", mm, pos + 4)[0]
+            if cid == b"fmt ":
+                fmt = struct.unpack_from("<HHIIHH", mm, pos + 8)
+                if fmt[0] == EXTENSIBLE:               # sub-format tag opens the GUID
+                    fmt = (struct.unpack_from("<H", mm, pos + 32)[0],) + fmt[1:]
+            elif cid == b"data":
+                data = (pos + 8, min(size, len(mm) - pos - 8))
+            pos += 8 + size + (size & 1)
+        if fmt is None or data is None:
+            raise ValueError(f"{path}: missing fmt or data chunk")
+        self.tag, self.channels, self.rate, _, self.align, self.bits = fmt
+        self.frames = data[1] // self.align
+        self.pcm = memoryview(mm)[data[0]:data[0] + self.frames * self.align]
+
+    def array(self):
+        """(frames, channels) view of the PCM; float32 / int16 / int32 as stored."""
+        if self.tag == FLOAT and self.bits == 32:
+            dtype = "<f4"
+        elif self.tag == PCM and self.bits in (16, 32):
+            dtype = f"<i{self.bits // 8}"
+        else:
+            raise ValueError(f"{self.path}: no array view for format {self.tag}/{self.bits} bit")
+        return np.frombuffer(self.pcm, dtype).reshape(self.frames, self.channels)
+
+    def seconds(self):
+        return self.frames / self.rate